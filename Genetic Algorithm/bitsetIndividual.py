@@ -0,0 +1,97 @@
+import numpy as np
+
+# Instance data shared by every individual: number of caches, capacity and video sizes.
+# gain_density[c, v] is the time video v could save per MB in cache c (0 when no endpoint
+# connected to c requests v) and useful[c] the ids of the videos worth placing in cache c;
+# without them every video that fits is considered and none is preferred
+class Layout:
+    def __init__(self, num_caches, capacity, video_sizes, gain_density=None):
+        self.num_caches = num_caches
+        self.capacity = capacity
+        self.num_videos = len(video_sizes)
+        self.video_sizes = np.asarray(video_sizes, dtype=np.int64)
+        self.row_bytes = (self.num_videos + 7) // 8 # one packed bitset row per cache
+        if gain_density is None:
+            gain_density = np.zeros((num_caches, self.num_videos), dtype=np.float32)
+            fitting = np.flatnonzero(self.video_sizes <= capacity)
+            self.useful = [fitting] * num_caches
+        else:
+            fitting = self.video_sizes <= capacity
+            self.useful = [np.flatnonzero((row > 0) & fitting) for row in gain_density]
+        self.gain_density = gain_density
+
+    # Unpacks bitset rows into booleans, one column per video
+    def unpack(self, rows):
+        return np.unpackbits(rows, axis=-1, count=self.num_videos, bitorder="little").view(bool)
+
+    def pack(self, placed):
+        return np.packbits(placed, axis=-1, bitorder="little")
+
+# GA individual stored as packed bitsets: bit v of row c is set when video v is in cache c,
+# with the used space of every cache alongside. It is C*V/8 bytes whatever the number of
+# placed videos, instead of a dict of Python sets, and operators work on whole rows
+class BitsetIndividual:
+    __slots__ = ("layout", "bits", "used")
+
+    def __init__(self, layout, bits=None, used=None):
+        self.layout = layout
+        self.bits = bits if bits is not None else np.zeros((layout.num_caches, layout.row_bytes), dtype=np.uint8)
+        self.used = used if used is not None else np.zeros(layout.num_caches, dtype=np.int64)
+
+    # Builds an individual from anything with items() -> (cache_id, video ids), e.g. a Solution
+    @classmethod
+    def from_solution(cls, layout, solution):
+        placed = np.zeros((layout.num_caches, layout.num_videos), dtype=bool)
+        for cache_id, video_ids in solution.items():
+            if video_ids:
+                placed[cache_id, np.fromiter(video_ids, dtype=np.intp, count=len(video_ids))] = True
+        return cls(layout, layout.pack(placed), placed.astype(np.int64) @ layout.video_sizes)
+
+    def copy(self):
+        return BitsetIndividual(self.layout, self.bits.copy(), self.used.copy())
+
+    def has(self, cache_id, video_id):
+        return bool(self.bits[cache_id, video_id >> 3] >> (video_id & 7) & 1)
+
+    def fits(self, cache_id, video_id):
+        return self.used[cache_id] + self.layout.video_sizes[video_id] <= self.layout.capacity
+
+    def free_space(self, cache_id):
+        return self.layout.capacity - int(self.used[cache_id])
+
+    def add(self, cache_id, video_id):
+        self.bits[cache_id, video_id >> 3] |= 1 << (video_id & 7)
+        self.used[cache_id] += self.layout.video_sizes[video_id]
+
+    def remove(self, cache_id, video_id):
+        self.bits[cache_id, video_id >> 3] &= ~(1 << (video_id & 7)) & 0xFF
+        self.used[cache_id] -= self.layout.video_sizes[video_id]
+
+    # Boolean row of the videos in a cache
+    def placed(self, cache_id):
+        return self.layout.unpack(self.bits[cache_id])
+
+    # Array of the video ids in a cache
+    def videos(self, cache_id):
+        return np.flatnonzero(self.placed(cache_id))
+
+    # Boolean (caches x videos) placement matrix
+    def to_bitmap(self):
+        return self.layout.unpack(self.bits)
+
+    # Dict-of-sets style access, for output and for code written against Solution
+    def __getitem__(self, cache_id):
+        return set(self.videos(cache_id).tolist())
+
+    def __contains__(self, cache_id):
+        return 0 <= cache_id < self.layout.num_caches
+
+    def __iter__(self):
+        return iter(range(self.layout.num_caches))
+
+    def __len__(self):
+        return self.layout.num_caches
+
+    def items(self):
+        for cache_id, row in enumerate(self.to_bitmap()):
+            yield cache_id, set(np.flatnonzero(row).tolist())
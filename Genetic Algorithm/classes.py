@@ -1,4 +1,7 @@
+# __slots__ keeps the objects small: there is one Video per video and one Endpoint per endpoint
 class Video:
+    __slots__ = ("id", "size")
+
     def __init__(self, id, size): #inicializa objeto Video
         self.id = id
         self.size = size
@@ -10,6 +13,8 @@ class Video:
         return isinstance(other, Video) and self.id == other.id
 
 class Endpoint:
+    __slots__ = ("id", "dataCenterLatency", "requests", "cacheLatencies")
+
     def __init__(self, id, data_center_latency):
         self.id = id
         self.dataCenterLatency = data_center_latency
@@ -21,7 +26,10 @@ class Endpoint:
     
     def __hash__(self):
         return hash(self.id)
+
 class Cache:
+    __slots__ = ("id", "capacity", "videos", "availableSpace")
+
     def __init__(self, id, capacity):
         self.id = id
         self.capacity = capacity
@@ -1,91 +1,182 @@
 import random
+import numpy as np
+from bitsetIndividual import BitsetIndividual, Layout
 from classes import Video, Cache, Endpoint # Keep imports
 
-# Helper function to calculate size of videos in a set
-def calculate_set_size(video_ids_set, videos_dict):
-    current_size = 0
-    for video_id in video_ids_set:
-        if video_id in videos_dict:
-            current_size += videos_dict[video_id].size
-    return current_size
+ADD_ATTEMPTS = 8 # Random draws from a cache's useful videos before a mutation gives up
+MERGE_RATE = 0.5 # Share of the caches where crossover merges both parents and repairs the result
+
+# Bitset layout of an instance, shared by all its individuals. With the endpoints it also holds
+# the potential gain per MB of every (cache, video), so operators only draw videos that some
+# endpoint connected to the cache requests and repair keeps the most valuable ones
+def make_layout(caches, videos, endpoints=None):
+    sizes = np.array([video.size for video in videos], dtype=np.int64)
+    gain_density = None
+    if endpoints is not None:
+        gain = np.zeros((len(caches), len(videos)), dtype=np.float64)
+        for endpoint in endpoints:
+            links = [(cache_id, endpoint.dataCenterLatency - latency)
+                     for cache_id, latency in endpoint.cacheLatencies.items()
+                     if latency < endpoint.dataCenterLatency]
+            if not links or not endpoint.requests:
+                continue
+            cache_ids, savings = np.array(links, dtype=np.int64).T
+            video_ids = np.fromiter(endpoint.requests.keys(), dtype=np.int64, count=len(endpoint.requests))
+            counts = np.fromiter(endpoint.requests.values(), dtype=np.int64, count=len(endpoint.requests))
+            # An endpoint has each cache and each video once, so the block has no repeated cells
+            gain[np.ix_(cache_ids, video_ids)] += np.outer(savings, counts)
+        gain_density = (gain / np.maximum(sizes, 1)).astype(np.float32)
+    return Layout(len(caches), caches[0].capacity, sizes, gain_density)
+
+# NumPy generator drawn from the random module, so seeding random (and checkpointing its state) covers it too
+def _rng():
+    return np.random.default_rng(random.getrandbits(64))
 
 # Creates a potential solution by randomly assigning videos to caches respecting capacity
-def create_individuals(caches, videos, videos_dict):
-    individual = {}
+def create_individuals(caches, videos, videos_dict, layout=None):
+    layout = layout or make_layout(caches, videos)
+    individual = BitsetIndividual(layout)
+    placed = np.zeros((layout.num_caches, layout.num_videos), dtype=bool)
+    rng = _rng()
+    sizes = layout.video_sizes
     for cache in caches:
-        individual[cache.id] = set() # videos stored in this cache for this individual
-        current_cache_size = 0
-        cache_capacity = cache.capacity
-
-        available_videos = list(videos) # copy of the video list
-        random.shuffle(available_videos) # shuffle for randomness
+        # First fit over a random order of the cache's useful videos: take the longest prefix
+        # that fits, skip the videos too large for the space left, and repeat on the rest
+        order = rng.permutation(layout.useful[cache.id])
+        free = layout.capacity
+        while len(order):
+            order = order[sizes[order] <= free]
+            if not len(order):
+                break
+            prefix = np.cumsum(sizes[order])
+            taken = int(np.searchsorted(prefix, free, side="right"))
+            placed[cache.id, order[:taken]] = True
+            free -= int(prefix[taken - 1])
+            order = order[taken:]
+        individual.used[cache.id] = layout.capacity - free
+    individual.bits[:] = layout.pack(placed)
+    return individual
 
-        for video in available_videos:
-            # Check if adding the video exceeds capacity
-            if current_cache_size + video.size <= cache_capacity:
-                individual[cache.id].add(video.id)
-                current_cache_size += video.size
+# Warm start: fills count slots of a population from seed solutions (e.g. loaded .out files),
+# each seed once as it is and the remaining slots with mutated copies of the seeds in turn
+def seed_individuals(seeds, count, videos, caches, videos_dict, mutation_rate):
+    individuals = []
+    for i in range(count):
+        individual = seeds[i % len(seeds)].copy()
+        if i >= len(seeds):
+            mutate(individual, videos, caches, videos_dict, mutation_rate)
+        individuals.append(individual)
+    return individuals
 
-    return individual
+# Greedy repair: empties the caches that exceed their capacity of their least valuable videos
+# (lowest potential gain per MB first) until they fit
+def repair(individual):
+    layout = individual.layout
+    sizes = layout.video_sizes
+    for cache_id in np.flatnonzero(individual.used > layout.capacity).tolist():
+        placed = individual.placed(cache_id)
+        video_ids = np.flatnonzero(placed)
+        order = video_ids[np.argsort(layout.gain_density[cache_id, video_ids], kind="stable")]
+        # Shortest prefix of that order whose removal frees enough space
+        freed = np.cumsum(sizes[order])
+        dropped = int(np.searchsorted(freed, individual.used[cache_id] - layout.capacity)) + 1
+        placed[order[:dropped]] = False
+        individual.bits[cache_id] = layout.pack(placed)
+        individual.used[cache_id] -= freed[dropped - 1]
 
 # Creates a child individual by combining parts of two parents, respecting capacity
 def crossover(parent1, parent2, caches, videos_dict):
-    child = {}
-    for cache in caches:
-        cache_id = cache.id
-        cache_capacity = cache.capacity
-        
-        # 1. Inherit video set from one parent randomly
-        if random.random() < 0.5:
-            # copy() is essential to avoid modifying the parent's set
-            child[cache_id] = parent1.get(cache_id, set()).copy()
-        else:
-            child[cache_id] = parent2.get(cache_id, set()).copy()
-
-        # 2. Check and enforce capacity constraint
-        current_child_cache_size = calculate_set_size(child[cache_id], videos_dict)
-
-        # While over capacity, randomly remove videos
-        videos_in_cache_list = list(child[cache_id]) # List to allow random removal
-        while current_child_cache_size > cache_capacity and videos_in_cache_list:
-            video_to_remove_id = random.choice(videos_in_cache_list)
-            
-            child[cache_id].remove(video_to_remove_id)
-            videos_in_cache_list.remove(video_to_remove_id) # Remove from temp list too
-            
-            if video_to_remove_id in videos_dict:
-                 current_child_cache_size -= videos_dict[video_to_remove_id].size
-            else: 
-                print(f"Warning: Video {video_to_remove_id} not in videos_dict during crossover removal.")
-
-
+    layout = parent1.layout
+    rng = _rng()
+    # Uniform crossover on whole caches: each row of bits (and its used space) comes from one parent
+    from_first = rng.random(layout.num_caches) < 0.5
+    bits = np.where(from_first[:, None], parent1.bits, parent2.bits)
+    used = np.where(from_first, parent1.used, parent2.used)
+    # Some caches also take the videos of the other parent, which may overfill them
+    merged = np.flatnonzero(rng.random(layout.num_caches) < MERGE_RATE)
+    if len(merged):
+        bits[merged] |= np.where(from_first[merged, None], parent2.bits[merged], parent1.bits[merged])
+        used[merged] = layout.unpack(bits[merged]).astype(np.int64) @ layout.video_sizes
+    child = BitsetIndividual(layout, bits, used)
+    repair(child)
     return child
 
-# Mutates an individual by randomly adding or removing videos, respecting capacity
+# Draws up to ADD_ATTEMPTS random videos of a list and returns the first one accepted, or None
+def _sample(video_ids, accept):
+    if len(video_ids):
+        for _ in range(ADD_ATTEMPTS):
+            video_id = int(video_ids[random.randrange(len(video_ids))])
+            if accept(video_id):
+                return video_id
+    return None
+
+# Mutates an individual by randomly adding or removing videos, respecting capacity.
+# Candidates are drawn from the cache's useful videos in O(1) each, add() and remove()
+# keep the used space up to date
 def mutate(individual, videos, caches, videos_dict, mutationRate):
+    layout = individual.layout
     for cache in caches:
         cache_id = cache.id
-        cache_capacity = cache.capacity
-        videos_in_cache = individual[cache_id] # The set for this cache
+        useful = layout.useful[cache_id]
 
-        # Attempt to ADD a video
+        # Attempt to ADD a useful video that is not in the cache and fits in its free space
         if random.random() < mutationRate:
-            # Find videos *not* already in this cache
-            eligible_videos = [v for v in videos if v.id not in videos_in_cache]
-            random.shuffle(eligible_videos)
-
-            current_cache_size = calculate_set_size(videos_in_cache, videos_dict)
-
-            for video_to_add in eligible_videos:
-                # Check if it fits
-                if current_cache_size + video_to_add.size <= cache_capacity:
-                    videos_in_cache.add(video_to_add.id)
-                    # No need to update current_cache_size here unless adding multiple
-                    break # Stop after adding one video
+            video_id = _sample(useful, lambda v: not individual.has(cache_id, v) and individual.fits(cache_id, v))
+            if video_id is not None:
+                individual.add(cache_id, video_id)
 
         # Attempt to REMOVE a video
         if random.random() < mutationRate:
-            if videos_in_cache: # Can only remove if the set is not empty
-                video_remove_id = random.choice(list(videos_in_cache))
-                videos_in_cache.remove(video_remove_id)
-                # No need to update cache size variable as it's recalculated if needed again
\ No newline at end of file
+            video_id = _sample(useful, lambda v: individual.has(cache_id, v))
+            if video_id is None:
+                # Nearly empty cache, or one holding videos from elsewhere (e.g. a seed): scan its row
+                placed = individual.videos(cache_id)
+                if len(placed): # Can only remove if the cache is not empty
+                    video_id = int(placed[random.randrange(len(placed))])
+            if video_id is not None:
+                individual.remove(cache_id, video_id)
+
+# Builds the next generation from (individual, fitness) pairs using tournament selection, crossover and mutation
+def next_generation(fitnesses, population_size, caches, videos, videos_dict, mutation_rate):
+    # Selection (Tournament Selection)
+    selected_parents = []
+    for _ in range(population_size):
+        # Select k individuals randomly for the tournament
+        tournament_size = 5
+        # Handle cases where population size is less than tournament size
+        actual_tournament_size = min(tournament_size, len(fitnesses))
+        if actual_tournament_size > 0:
+             tournament = random.sample(fitnesses, actual_tournament_size)
+             # Winner is the one with the highest fitness
+             winner = max(tournament, key=lambda item: item[1])[0] # Get the individual
+             selected_parents.append(winner)
+        elif fitnesses: # If population exists but smaller than tournament size
+             selected_parents.append(fitnesses[0][0]) # Fallback: select the first one
+
+    # Create the next generation using Crossover and Mutation
+    new_population = []
+    # Ensure even number for pairing, handle odd population size
+    num_pairs = population_size // 2
+    for i in range(num_pairs):
+        parent1 = selected_parents[i*2]
+        parent2 = selected_parents[i*2+1]
+
+        # Apply crossover - pass videos_dict
+        child1 = crossover(parent1, parent2, caches, videos_dict)
+        child2 = crossover(parent2, parent1, caches, videos_dict) # Can swap parents for potentially different child
+
+        # Apply mutation - pass videos_dict
+        mutate(child1, videos, caches, videos_dict, mutation_rate)
+        mutate(child2, videos, caches, videos_dict, mutation_rate)
+
+        new_population.extend([child1, child2])
+
+    # If population size is odd, add one more individual (e.g., a mutated copy of a winner)
+    if population_size % 2 != 0 and selected_parents:
+        parent_extra = selected_parents[-1] # Use the last selected parent
+        child_extra = parent_extra.copy() # Start with a copy
+         # Mutate the extra child
+        mutate(child_extra, videos, caches, videos_dict, mutation_rate)
+        new_population.append(child_extra)
+
+    return new_population
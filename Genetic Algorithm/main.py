@@ -1,11 +1,37 @@
+import argparse
+import os
 import random
+import sys
 import time # To time execution
+
+# problem, solution, checkpoint and telemetry are shared with the solvers of the repository root:
+# make them importable (after this folder's modules) when main.py is run as a script
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
 from classes import Video, Cache, Endpoint
 # Import the corrected evaluation function
-from fitness import evaluate_solution
+from fitness import evaluate_solution, MemoizedEvaluator
 # Import corrected GA operators
-from gaOperators import create_individuals, crossover, mutate
+from bitsetIndividual import BitsetIndividual
+from gaOperators import create_individuals, make_layout, next_generation, seed_individuals
 from parsing import parse_input
+from solution import load_solution
+from parallelGA import ParallelEvaluator, island_genetic_algorithm
+import checkpoint
+import telemetry
+
+# GA Parameters (defaults of the command line options)
+INPUT_FILE = "dataset/videos_worth_spreading.in"
+POPULATION_SIZE = 100
+MUTATION_RATE = 0.05 # Often lower mutation rates are better
+GENERATIONS = 100   # More generations might be needed for complex problems
+WORKERS = 1 # Processes used to evaluate fitness
+ISLANDS = 0 # 0 disables the island model, otherwise one worker process per island
+MIGRATION_INTERVAL = 10 # Generations between migrations
+MIGRATION_SIZE = 2 # Best individuals sent to the next island at each migration
+SEED_FRACTION = 0.2 # Share of the population seeded from --init-from solutions (at least one slot per file)
 
 # Fitness wrapper: Takes an individual (solution representation) and calculates its score
 def calculate_fitness(individual, caches, endpoints, videos_dict):
@@ -37,86 +63,135 @@ def calculate_fitness(individual, caches, endpoints, videos_dict):
                  temp_caches_list[i] = Cache(i, original_cache.capacity)
     return evaluate_solution(temp_caches_list, endpoints)
 
-def genetic_algorithm(caches, endpoints, videos, videos_dict, population_size, mutation_rate, generations):
-    # Generate initial population - pass videos_dict
-    population = [create_individuals(caches, videos, videos_dict) for _ in range(population_size)]
+# Builds the Video, Cache and Endpoint objects used by the GA from the parsed input
+def build_problem(video_sizes_list, num_caches, cache_capacity, endpoint_data_list, request_data_list):
+    # Create Video objects and a dictionary for quick lookup by ID
+    videos = [Video(i, size) for i, size in enumerate(video_sizes_list)]
+    videos_dict = {v.id: v for v in videos}
+    print(f"Created {len(videos)} Video objects.")
+
+    # Create Cache objects (original state)
+    caches = [Cache(i, cache_capacity) for i in range(num_caches)]
+    print(f"Created {len(caches)} Cache objects with capacity {cache_capacity}.")
+
+    # Create Endpoint objects, endpoints[i] being endpoint i
+    endpoints = []
+    for i, (dc_latency, cache_connections) in enumerate(endpoint_data_list):
+        # Create endpoint with its specific data center latency
+        endpoint = Endpoint(id=i, data_center_latency=dc_latency)
+        # Assign cache latencies directly
+        endpoint.cacheLatencies = cache_connections
+        endpoints.append(endpoint)
+
+    print(f"Created {len(endpoints)} Endpoint objects.")
+
+    # Assign requests to their respective Endpoints by direct indexing (ids are positions),
+    # summing the request lines that repeat a (video, endpoint) pair
+    num_videos, num_endpoints = len(videos), len(endpoints)
+    requests_assigned_count = 0
+    for video_id, endpoint_id, num_requests in request_data_list:
+        if not 0 <= endpoint_id < num_endpoints:
+            print(f"Warning: Endpoint ID {endpoint_id} from request not found.")
+        elif not 0 <= video_id < num_videos:
+            print(f"Warning: Video ID {video_id} from request not found in videos_dict.")
+        else:
+            endpoint_requests = endpoints[endpoint_id].requests
+            endpoint_requests[video_id] = endpoint_requests.get(video_id, 0) + num_requests
+            requests_assigned_count += 1
+    print(f"Assigned {requests_assigned_count} requests to endpoints.")
+    return caches, endpoints, videos, videos_dict
+
+# progress(generation, best_fitness), if given, is called after every generation;
+# time_limit (seconds) stops the evolution early; run_telemetry (a telemetry.Telemetry) gets
+# the time spent in fitness evaluation ("scoring") vs selection/crossover/mutation ("moves");
+# checkpointer (a checkpoint.Checkpointer) periodically gets the population, the best individual
+# and the RNG state, and resume (a state loaded from such a checkpoint) continues that run;
+# initial_population (warm-start individuals) takes the first slots of the random population
+def genetic_algorithm(caches, endpoints, videos, videos_dict, population_size, mutation_rate, generations, workers=1,
+                      progress=None, time_limit=None, run_telemetry=None, checkpointer=None, resume=None,
+                      initial_population=None):
+    # Vectorized evaluator shared by every generation (it remembers the fitness of individuals and endpoint
+    # contributions it already scored), spread over a process pool if requested
+    if workers > 1:
+        evaluator = ParallelEvaluator(caches, endpoints, videos, workers)
+    else:
+        evaluator = MemoizedEvaluator(caches, endpoints, len(videos))
 
     best_fitness_overall = -1 # Initialize with a value lower than any possible fitness
     best_individual_overall = None
+    completed = 0 # Generations done, including those of a resumed run
+    layout = make_layout(caches, videos, endpoints)
+
+    if resume is not None:
+        # Continue the checkpointed run where it stopped
+        population = [BitsetIndividual(layout, bits, used) for bits, used in resume["population"]]
+        best_individual_overall = BitsetIndividual(layout, *resume["best"])
+        best_fitness_overall = resume["best_fitness"]
+        completed = resume["generation"]
+        random.setstate(resume["rng"])
+    else:
+        # Generate initial population - pass videos_dict
+        population = list(initial_population or [])[:population_size]
+        population += [create_individuals(caches, videos, videos_dict, layout)
+                       for _ in range(population_size - len(population))]
+
+    # Copies of the bitsets, the checkpointer writes them in the background
+    def state():
+        return {"generation": completed, "rng": random.getstate(),
+                "population": [(individual.bits.copy(), individual.used.copy()) for individual in population],
+                "best": (best_individual_overall.bits.copy(), best_individual_overall.used.copy()),
+                "best_fitness": best_fitness_overall}
 
     start_time = time.time()
+    if run_telemetry is not None:
+        run_telemetry.lap("setup")
 
-    for generation in range(generations):
-        gen_start_time = time.time()
-        # Calculate fitness for the current population
-        fitnesses = []
-        for individual in population:
-             fit = calculate_fitness(individual, caches, endpoints, videos_dict)
-             fitnesses.append((individual, fit))
-
-        # Find best in current generation for tracking
-        current_best_individual, current_best_fitness = max(fitnesses, key=lambda item: item[1])
-        if current_best_fitness > best_fitness_overall:
-             best_fitness_overall = current_best_fitness
-             best_individual_overall = current_best_individual # Store the actual best individual
-
-
-        # Selection (Tournament Selection)
-        selected_parents = []
-        for _ in range(population_size):
-            # Select k individuals randomly for the tournament
-            tournament_size = 5
-            # Handle cases where population size is less than tournament size
-            actual_tournament_size = min(tournament_size, len(fitnesses))
-            if actual_tournament_size > 0:
-                 tournament = random.sample(fitnesses, actual_tournament_size)
-                 # Winner is the one with the highest fitness
-                 winner = max(tournament, key=lambda item: item[1])[0] # Get the individual
-                 selected_parents.append(winner)
-            elif fitnesses: # If population exists but smaller than tournament size
-                 selected_parents.append(fitnesses[0][0]) # Fallback: select the first one
-
-
-        # Create the next generation using Crossover and Mutation
-        new_population = []
-        # Ensure even number for pairing, handle odd population size
-        num_pairs = population_size // 2
-        for i in range(num_pairs):
-            parent1 = selected_parents[i*2]
-            parent2 = selected_parents[i*2+1]
-
-            # Apply crossover - pass videos_dict
-            child1 = crossover(parent1, parent2, caches, videos_dict)
-            child2 = crossover(parent2, parent1, caches, videos_dict) # Can swap parents for potentially different child
-
-            # Apply mutation - pass videos_dict
-            mutate(child1, videos, caches, videos_dict, mutation_rate)
-            mutate(child2, videos, caches, videos_dict, mutation_rate)
-
-            new_population.extend([child1, child2])
-
-        # If population size is odd, add one more individual (e.g., a mutated copy of a winner)
-        if population_size % 2 != 0 and selected_parents:
-            parent_extra = selected_parents[-1] # Use the last selected parent
-            child_extra = parent_extra.copy() # Start with a copy
-             # Mutate the extra child
-            mutate(child_extra, videos, caches, videos_dict, mutation_rate)
-            new_population.append(child_extra)
-
-
-        population = new_population # Update population for the next generation
-
-        gen_end_time = time.time()
-        print(f"Generation {generation + 1}/{generations}: Best Fitness = {best_fitness_overall}. Time: {gen_end_time - gen_start_time:.2f}s")
-
-    end_time = time.time()
-    print(f"\nGA finished in {end_time - start_time:.2f} seconds.")
-
-    # Re-evaluate the final population to ensure we have the absolute best
-    final_fitnesses = []
-    for individual in population:
-        fit = calculate_fitness(individual, caches, endpoints, videos_dict)
-        final_fitnesses.append((individual, fit))
+    # The pool workers must be stopped even when the run fails
+    try:
+        for generation in range(completed, generations):
+            if time_limit is not None and time.time() - start_time >= time_limit:
+                print(f"Time limit reached after {generation} generations.")
+                break
+            gen_start_time = time.time()
+            # Calculate fitness for the current population
+            fitnesses = list(zip(population, evaluator.evaluate(population).tolist()))
+            if run_telemetry is not None:
+                run_telemetry.lap("scoring")
+
+            # Find best in current generation for tracking
+            current_best_individual, current_best_fitness = max(fitnesses, key=lambda item: item[1])
+            if current_best_fitness > best_fitness_overall:
+                 best_fitness_overall = current_best_fitness
+                 best_individual_overall = current_best_individual # Store the actual best individual
+
+
+            # Selection, crossover and mutation
+            population = next_generation(fitnesses, population_size, caches, videos, videos_dict, mutation_rate)
+            if run_telemetry is not None:
+                run_telemetry.lap("moves")
+                run_telemetry.update(generation + 1, current_best_fitness, best_fitness_overall,
+                                     evaluations=(generation + 1) * population_size)
+
+            gen_end_time = time.time()
+            print(f"Generation {generation + 1}/{generations}: Best Fitness = {best_fitness_overall}. Time: {gen_end_time - gen_start_time:.2f}s")
+            if progress is not None:
+                progress(generation + 1, best_fitness_overall)
+            completed = generation + 1
+            if checkpointer is not None and checkpointer.due():
+                checkpointer.save(state())
+
+        # Nothing to save when no generation ran
+        if checkpointer is not None:
+            checkpointer.close(state() if best_individual_overall is not None else None)
+
+        end_time = time.time()
+        print(f"\nGA finished in {end_time - start_time:.2f} seconds.")
+
+        # Re-evaluate the final population to ensure we have the absolute best
+        final_fitnesses = list(zip(population, evaluator.evaluate(population).tolist()))
+    finally:
+        if workers > 1:
+            evaluator.close()
 
     if final_fitnesses: # Ensure population is not empty
         best_individual_final, best_fitness_final = max(final_fitnesses, key=lambda item: item[1])
@@ -133,56 +208,67 @@ def genetic_algorithm(caches, endpoints, videos, videos_dict, population_size, m
 
 
 if __name__ == "__main__":
-    inputFile = "dataset/videos_worth_spreading.in" 
-    # GA Parameters
-    POPULATION_SIZE = 10
-    MUTATION_RATE = 0.05 # Often lower mutation rates are better
-    GENERATIONS = 10    # More generations might be needed for complex problems
+    parser = argparse.ArgumentParser(description="Genetic algorithm for the HashCode 2017 video caching problem.")
+    parser.add_argument("input_file", nargs="?", default=INPUT_FILE)
+    parser.add_argument("--population", type=int, default=POPULATION_SIZE)
+    parser.add_argument("--mutation-rate", type=float, default=MUTATION_RATE)
+    parser.add_argument("--generations", type=int, default=GENERATIONS)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="processes used for fitness evaluation")
+    parser.add_argument("--islands", type=int, default=ISLANDS, help="number of islands (0 = single population)")
+    parser.add_argument("--migration-interval", type=int, default=MIGRATION_INTERVAL)
+    parser.add_argument("--migration-size", type=int, default=MIGRATION_SIZE)
+    parser.add_argument("--init-from", nargs="+", metavar="FILE", default=[],
+                        help="seed part of the population from existing .out solutions")
+    parser.add_argument("--seed-fraction", type=float, default=SEED_FRACTION,
+                        help="share of the population seeded from --init-from (mutated copies fill it)")
+    telemetry.add_arguments(parser)
+    checkpoint.add_arguments(parser)
+    args = parser.parse_args()
+    if args.islands > 0 and args.resume:
+        parser.error("--resume is not supported with --islands")
+    if args.init_from and args.resume:
+        parser.error("--init-from and --resume are exclusive")
+
+    inputFile = args.input_file
+    POPULATION_SIZE = args.population
+    MUTATION_RATE = args.mutation_rate
+    GENERATIONS = args.generations
+
+    run_telemetry = telemetry.from_args(args, "ga")
+    # The checkpoint goes next to the output file
+    checkpoint_file = inputFile.replace(".in", ".ckpt")
+    if args.resume and not os.path.exists(checkpoint_file):
+        print(f"Error: no checkpoint to resume from at {checkpoint_file}")
+        sys.exit(1)
+    checkpointer, resume = checkpoint.from_args(args, checkpoint_file, "ga", os.path.basename(inputFile))
 
     print(f"Parsing input file: {inputFile}...")
     # Parse the input file - Renamed variables for clarity
-    num_videos, num_endpoints, num_requests_desc, num_caches, cache_capacity, \
-        video_sizes_list, endpoint_data_list, request_data_list = parse_input(inputFile)
+    with telemetry.timed(run_telemetry, "io"):
+        num_videos, num_endpoints, num_requests_desc, num_caches, cache_capacity, \
+            video_sizes_list, endpoint_data_list, request_data_list = parse_input(inputFile)
     print("Parsing complete.")
     print(f" V={num_videos}, E={num_endpoints}, R={num_requests_desc}, C={num_caches}, X={cache_capacity}")
 
 
-    # Create Video objects and a dictionary for quick lookup by ID
-    videos = [Video(i, size) for i, size in enumerate(video_sizes_list)]
-    videos_dict = {v.id: v for v in videos}
-    print(f"Created {len(videos)} Video objects.")
-
-    # Create Cache objects (original state)
-    caches = [Cache(i, cache_capacity) for i in range(num_caches)]
-    print(f"Created {len(caches)} Cache objects with capacity {cache_capacity}.")
-
-    # Create Endpoint objects
-    endpoints = []
-    for i, (dc_latency, cache_connections) in enumerate(endpoint_data_list):
-        # Create endpoint with its specific data center latency
-        endpoint = Endpoint(id=i, data_center_latency=dc_latency)
-        # Assign cache latencies directly
-        endpoint.cacheLatencies = cache_connections
-        endpoints.append(endpoint)
-
-    print(f"Created {len(endpoints)} Endpoint objects.")
-
-    # Assign requests to their respective Endpoints
-    requests_assigned_count = 0
-    for video_id, endpoint_id, num_requests in request_data_list:
-        # Find the endpoint object by ID
-        # Using list comprehension + next is safer than assuming endpoint_id is a direct index
-        endpoint = next((e for e in endpoints if e.id == endpoint_id), None)
-        if endpoint:
-            # Check if video_id is valid
-            if video_id in videos_dict:
-                endpoint.requests[video_id] = num_requests
-                requests_assigned_count += 1
-            else:
-                print(f"Warning: Video ID {video_id} from request not found in videos_dict.")
-        else:
-            print(f"Warning: Endpoint ID {endpoint_id} from request not found.")
-    print(f"Assigned {requests_assigned_count} requests to endpoints.")
+    with telemetry.timed(run_telemetry, "init"):
+        caches, endpoints, videos, videos_dict = build_problem(
+            video_sizes_list, num_caches, cache_capacity, endpoint_data_list, request_data_list)
+
+    # Warm start from previous solutions
+    initial_population = []
+    if args.init_from:
+        video_sizes = [v.size for v in videos]
+        try:
+            layout = make_layout(caches, videos, endpoints)
+            seeds = [BitsetIndividual.from_solution(layout, load_solution(path, num_caches, cache_capacity, video_sizes))
+                     for path in args.init_from]
+        except (OSError, ValueError) as e:
+            print(f"Error: cannot seed the population: {e}")
+            sys.exit(1)
+        seeded = min(POPULATION_SIZE, max(len(seeds), round(POPULATION_SIZE * args.seed_fraction)))
+        initial_population = seed_individuals(seeds, seeded, videos, caches, videos_dict, MUTATION_RATE)
+        print(f"Seeded {seeded} individuals from {len(seeds)} solution(s).")
 
     print(f"\nStarting Genetic Algorithm...")
     print(f" Population Size: {POPULATION_SIZE}")
@@ -190,10 +276,20 @@ if __name__ == "__main__":
     print(f" Generations: {GENERATIONS}")
 
     # Pass necessary data to the GA function
-    best_solution_individual = genetic_algorithm(
-        caches, endpoints, videos, videos_dict,
-        POPULATION_SIZE, MUTATION_RATE, GENERATIONS
-    )
+    if args.islands > 0:
+        print(f" Islands: {args.islands} (migrating {args.migration_size} every {args.migration_interval} generations)")
+        best_solution_individual = island_genetic_algorithm(
+            caches, endpoints, videos,
+            POPULATION_SIZE, MUTATION_RATE, GENERATIONS,
+            args.islands, args.migration_interval, args.migration_size, run_telemetry=run_telemetry,
+            initial_population=initial_population
+        )
+    else:
+        best_solution_individual = genetic_algorithm(
+            caches, endpoints, videos, videos_dict,
+            POPULATION_SIZE, MUTATION_RATE, GENERATIONS, args.workers, run_telemetry=run_telemetry,
+            checkpointer=checkpointer, resume=resume, initial_population=initial_population
+        )
 
     # --- Evaluate and Print Final Result ---
     print("\nCalculating fitness of the best solution found...")
@@ -204,7 +300,7 @@ if __name__ == "__main__":
     output_filename = inputFile.replace(".in", ".out")
     print(f"\nPreparing output file: {output_filename}")
     try:
-        with open(output_filename, 'w') as f_out:
+        with telemetry.timed(run_telemetry, "io"), open(output_filename, 'w') as f_out:
             # Count how many caches are actually used in the best solution
             used_caches = {cache_id: videos for cache_id, videos in best_solution_individual.items() if videos}
             f_out.write(f"{len(used_caches)}\n") # First line: number of caches used
@@ -219,4 +315,6 @@ if __name__ == "__main__":
     except IOError as e:
         print(f"Error writing output file: {e}")
 
+    if run_telemetry is not None:
+        run_telemetry.close()
     print("\nExecution finished.")
\ No newline at end of file
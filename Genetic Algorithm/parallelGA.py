@@ -0,0 +1,129 @@
+import random
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from fitness import MemoizedEvaluator
+from bitsetIndividual import BitsetIndividual
+from gaOperators import create_individuals, make_layout, next_generation
+
+# Problem data of the current worker process, set once by _init_worker
+_worker = {}
+
+def _init_worker(caches, endpoints, videos):
+    # Runs once per worker: the problem is pickled here instead of with every task
+    _worker["caches"] = caches
+    _worker["videos"] = videos
+    _worker["videos_dict"] = {v.id: v for v in videos}
+    _worker["evaluator"] = MemoizedEvaluator(caches, endpoints, len(videos))
+    _worker["layout"] = make_layout(caches, videos, endpoints)
+
+# Individuals travel between processes as their raw (bits, used) arrays, the layout stays in each process
+def _pack(individual):
+    return individual.bits, individual.used
+
+def _unpack(packed, layout=None):
+    return BitsetIndividual(layout or _worker["layout"], *packed)
+
+def _evaluate_chunk(packed_population):
+    return _worker["evaluator"].evaluate([_unpack(packed) for packed in packed_population]).tolist()
+
+# Distributes fitness evaluation of a population over a process pool
+class ParallelEvaluator:
+    def __init__(self, caches, endpoints, videos, workers):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                            initargs=(caches, endpoints, videos))
+
+    def evaluate(self, population):
+        packed = [_pack(individual) for individual in population]
+        chunk = max(1, -(-len(packed) // self.workers)) # ceil division, one chunk per worker
+        chunks = [packed[i:i + chunk] for i in range(0, len(packed), chunk)]
+        fitnesses = []
+        for result in self.executor.map(_evaluate_chunk, chunks):
+            fitnesses.extend(result)
+        return np.array(fitnesses, dtype=np.int64)
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Evolves one island for a number of generations inside a worker
+def _evolve_island(packed_population, immigrants, island_size, mutation_rate, generations, seed):
+    random.seed(seed)
+    caches, videos, videos_dict = _worker["caches"], _worker["videos"], _worker["videos_dict"]
+    evaluator = _worker["evaluator"]
+
+    if packed_population is None:
+        # First epoch: warm-start individuals arrive as immigrants, random ones fill the island
+        population = [_unpack(packed) for packed in immigrants]
+        population += [create_individuals(caches, videos, videos_dict, _worker["layout"])
+                       for _ in range(island_size - len(population))]
+    else:
+        population = [_unpack(packed) for packed in packed_population + immigrants]
+
+    best_individual, best_fitness = None, -1
+    for _ in range(generations):
+        fitnesses = list(zip(population, evaluator.evaluate(population).tolist()))
+        # Immigrants compete for a place, so the island keeps its size
+        fitnesses.sort(key=lambda item: item[1], reverse=True)
+        fitnesses = fitnesses[:island_size]
+        if fitnesses[0][1] > best_fitness:
+            best_individual, best_fitness = fitnesses[0]
+        population = next_generation(fitnesses, island_size, caches, videos, videos_dict, mutation_rate)
+
+    fitnesses = list(zip(population, evaluator.evaluate(population).tolist()))
+    fitnesses.sort(key=lambda item: item[1], reverse=True)
+    if fitnesses[0][1] > best_fitness:
+        best_individual, best_fitness = fitnesses[0]
+    return [_pack(individual) for individual, _ in fitnesses], _pack(best_individual), best_fitness
+
+# Island model: every worker evolves its own sub-population and the best individuals
+# of each island migrate to the next one (ring topology) every migration_interval generations.
+# Islands run in other processes, so run_telemetry only gets the wall time of each epoch ("islands").
+# initial_population (warm-start individuals) is dealt to the islands in turn
+def island_genetic_algorithm(caches, endpoints, videos, population_size, mutation_rate, generations,
+                             islands, migration_interval=10, migration_size=2, run_telemetry=None,
+                             initial_population=None):
+    island_size = max(2, population_size // islands)
+    populations = [None] * islands
+    immigrants = [[] for _ in range(islands)]
+    for i, individual in enumerate(initial_population or []):
+        if len(immigrants[i % islands]) < island_size:
+            immigrants[i % islands].append(_pack(individual))
+
+    best_packed, best_fitness = None, -1
+    start_time = time.time()
+    if run_telemetry is not None:
+        run_telemetry.lap("setup")
+    with ProcessPoolExecutor(max_workers=islands, initializer=_init_worker,
+                             initargs=(caches, endpoints, videos)) as executor:
+        done = 0
+        # With no generations, one empty epoch still evaluates the initial islands
+        while done < generations or best_packed is None:
+            epoch = min(migration_interval, generations - done)
+            futures = [executor.submit(_evolve_island, populations[i], immigrants[i], island_size,
+                                       mutation_rate, epoch, random.randrange(2 ** 32))
+                       for i in range(islands)]
+            results = [future.result() for future in futures]
+            done += epoch
+
+            for i, (population, island_best, island_fitness) in enumerate(results):
+                populations[i] = population
+                if island_fitness > best_fitness:
+                    best_packed, best_fitness = island_best, island_fitness
+            # Populations come back sorted, so the first individuals are the island's best
+            immigrants = [results[i - 1][0][:migration_size] for i in range(islands)]
+            if run_telemetry is not None:
+                run_telemetry.lap("islands")
+                run_telemetry.update(done, max(fitness for _, _, fitness in results), best_fitness,
+                                     evaluations=done * island_size * islands)
+
+            print(f"Generation {done}/{generations}: Best Fitness = {best_fitness} "
+                  f"({islands} islands). Elapsed: {time.time() - start_time:.2f}s")
+
+    return _unpack(best_packed, make_layout(caches, videos))
@@ -0,0 +1,275 @@
+import argparse
+import contextlib
+import csv
+import glob
+import importlib
+import io
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from generator import generate_instance, scaled_parameters, write_instance
+from hillclimbing import compute_score
+from initialization import INIT_METHODS, build_solution
+from problem import parse_input
+from solution import Solution
+from solvers import SOLVERS as LOCAL_SEARCHES
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+GA_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Genetic Algorithm")
+
+CSV_FIELDS = ("solver", "workers", "instance", "instance_mb", "seed", "score", "parse_time", "init_time", "search_time",
+              "iterations", "iterations_per_second", "peak_memory_mb")
+
+
+def _local_search(search):
+    """Adapts a local search to the benchmark interface, starting from the requested initializer.
+
+    Local searches run in a single process, so workers is ignored.
+    """
+    def run(problem, init, time_limit, progress, workers=1):
+        V, E, R, C, X, video_sizes, endpoints, requests = problem
+        start = time.perf_counter()
+        cache_videos = build_solution(init, V, C, X, video_sizes, endpoints, requests)
+        init_time = time.perf_counter() - start
+        solution = search(cache_videos, V, C, X, video_sizes, endpoints, requests,
+                          max_iters=None, time_limit=time_limit, progress=progress)
+        return solution, init_time
+    return run
+
+
+def _genetic_algorithm(problem, init, time_limit, progress, workers=1):
+    """Runs the GA of "Genetic Algorithm/" with its default parameters and workers fitness evaluation processes.
+
+    The initializer is not used.
+    """
+    if GA_FOLDER not in sys.path:
+        sys.path.insert(0, GA_FOLDER)
+    ga = importlib.import_module("main")
+    V, E, R, C, X, video_sizes, endpoints, requests = problem
+    total_requests = sum(num_requests for _, _, num_requests in requests)
+
+    start = time.perf_counter()
+    caches, ga_endpoints, videos, videos_dict = ga.build_problem(video_sizes, C, X, endpoints, requests)
+    init_time = time.perf_counter() - start
+
+    # The GA reports the total saved time, the trace keeps the problem's score
+    def report(generation, best_fitness):
+        progress(generation, (best_fitness * 1000) // total_requests if total_requests > 0 else 0)
+
+    individual = ga.genetic_algorithm(caches, ga_endpoints, videos, videos_dict, ga.POPULATION_SIZE, ga.MUTATION_RATE,
+                                      sys.maxsize, workers=workers, progress=report, time_limit=time_limit)
+    # GA individuals are bitsets, compute_score wants set lookups
+    solution = Solution(C, X, video_sizes)
+    for cache_id, video_ids in individual.items():
+        solution.assign(cache_id, video_ids)
+    return solution, init_time
+
+
+# run(problem, init, time_limit, progress, workers) -> (solution, init_time) for every solver; local searches
+# come from the solvers.py registry
+SOLVERS = {name: _local_search(search) for name, (search, _) in LOCAL_SEARCHES.items()}
+SOLVERS["ga"] = _genetic_algorithm
+
+
+def _peak_memory_mb():
+    """Peak resident memory of the current process in MB, or None where it cannot be measured."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_benchmark(solver, input_path, seed, time_limit, init="density", use_cache=True, workers=1):
+    """Runs one solver on one instance and returns its measurements, including the score-over-time trace."""
+    start = time.perf_counter()
+    problem = parse_input(input_path, use_cache=use_cache)
+    parse_time = time.perf_counter() - start
+    V, E, R, C, X, video_sizes, endpoints, requests = problem
+
+    random.seed(seed)
+    trace = []
+    search_start = None
+
+    def progress(iteration, score):
+        trace.append((round(time.perf_counter() - search_start, 4), iteration, score))
+
+    # Solvers print their own progress, which would interleave between runs
+    with contextlib.redirect_stdout(io.StringIO()):
+        search_start = time.perf_counter()
+        solution, init_time = SOLVERS[solver](problem, init, time_limit, progress, workers)
+        search_time = time.perf_counter() - search_start - init_time
+
+    iterations = trace[-1][1] if trace else 0
+    return {
+        "solver": solver,
+        "workers": workers,
+        "instance": os.path.basename(input_path),
+        "instance_mb": round(os.path.getsize(input_path) / (1024 * 1024), 2),
+        "seed": seed,
+        "score": compute_score(solution, video_sizes, endpoints, requests),
+        "parse_time": round(parse_time, 4),
+        "init_time": round(init_time, 4),
+        "search_time": round(search_time, 4),
+        "iterations": iterations,
+        "iterations_per_second": round(iterations / search_time, 1) if search_time > 0 else None,
+        "peak_memory_mb": _peak_memory_mb(),
+        "trace": trace,
+    }
+
+
+def benchmark(solvers, input_paths, seeds, time_limit, init="density", use_cache=True, ga_workers=(1,)):
+    """Runs every (solver, instance, seed) combination, each in a fresh process so peak memory is per run.
+
+    The GA runs once per entry of ga_workers, its number of fitness evaluation processes.
+    """
+    results = []
+    for input_path in input_paths:
+        for solver in solvers:
+            for workers in (ga_workers if solver == "ga" else (1,)):
+                for seed in seeds:
+                    with ProcessPoolExecutor(max_workers=1) as executor:
+                        result = executor.submit(run_benchmark, solver, input_path, seed, time_limit,
+                                                 init, use_cache, workers).result()
+                    print(f"{result['instance']} {solver} workers={workers} seed={seed}: score={result['score']} "
+                          f"parse={result['parse_time']:.2f}s it/s={result['iterations_per_second']} "
+                          f"peak={result['peak_memory_mb']}MB", flush=True)
+                    results.append(result)
+    return results
+
+
+def save_report(results, settings, output_folder):
+    """Writes the results as JSON (with the traces) and CSV (one row per run) and returns both paths."""
+    os.makedirs(output_folder, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    json_path = os.path.join(output_folder, f"benchmark_{stamp}.json")
+    csv_path = os.path.join(output_folder, f"benchmark_{stamp}.csv")
+
+    with open(json_path, "w") as f:
+        json.dump({"settings": settings, "results": results}, f, indent=1)
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+    return json_path, csv_path
+
+
+def compare(results, baseline_path, tolerance=0.05):
+    """Prints the runs whose score or throughput dropped by more than tolerance against a previous JSON report.
+
+    Returns the number of regressions found.
+    """
+    with open(baseline_path) as f:
+        baseline = {(r["solver"], r.get("workers", 1), r["instance"], r["seed"]): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    for result in results:
+        previous = baseline.get((result["solver"], result["workers"], result["instance"], result["seed"]))
+        if previous is None:
+            continue
+        for field in ("score", "iterations_per_second"):
+            old, new = previous[field], result[field]
+            if old and new is not None and new < old * (1 - tolerance):
+                print(f"Regression: {result['instance']} {result['solver']} seed={result['seed']} "
+                      f"{field} {old} -> {new}")
+                regressions += 1
+    return regressions
+
+
+def synthetic_instances(scales, folder, seed=0):
+    """Generates (once) the instances of generator.py at each scale and returns their paths."""
+    paths = []
+    for scale in scales:
+        sizes = scaled_parameters(scale)
+        # Named after the sizes, so files generated with other base sizes are not reused
+        path = os.path.join(folder, f"synthetic_{sizes['V']}_{sizes['E']}_{sizes['R']}_{sizes['C']}_seed{seed}.in")
+        if not os.path.exists(path):
+            start = time.perf_counter()
+            write_instance(path, *generate_instance(**sizes, seed=seed))
+            print(f"Generated {path} in {time.perf_counter() - start:.1f}s", flush=True)
+        paths.append(path)
+    return paths
+
+
+def print_scaling(results):
+    """Prints parse time, throughput and memory of every solver as the instance size grows."""
+    print(f"{'instance':<40} {'solver':<6} {'size MB':>8} {'parse s':>8} {'it/s':>10} {'peak MB':>8}")
+    for result in sorted(results, key=lambda r: (r["solver"], r["instance_mb"])):
+        print(f"{result['instance']:<40} {result['solver']:<6} {result['instance_mb']:8.1f} "
+              f"{result['parse_time']:8.2f} {result['iterations_per_second'] or 0:10.1f} "
+              f"{result['peak_memory_mb'] or 0:8.1f}")
+
+
+def print_speedup(results):
+    """Prints the GA generations per second of every worker count against a single worker."""
+    print(f"{'instance':<40} {'workers':>7} {'gen/s':>8} {'speedup':>8}")
+    runs = {}
+    for result in results:
+        if result["solver"] == "ga" and result["iterations_per_second"]:
+            runs.setdefault((result["instance"], result["workers"]), []).append(result["iterations_per_second"])
+    for (instance, workers), rates in sorted(runs.items()):
+        rate = sum(rates) / len(rates)
+        single = runs.get((instance, 1))
+        speedup = f"{rate / (sum(single) / len(single)):8.2f}" if single else f"{'-':>8}"
+        print(f"{instance:<40} {workers:>7} {rate:8.2f} {speedup}")
+
+
+def main():
+    """Main function to benchmark the solvers on the dataset instances."""
+    parser = argparse.ArgumentParser(description="Benchmarks the solvers on the instances of dataset/.")
+    parser.add_argument("instances", nargs="*", help="names of .in files inside dataset/ (default: all)")
+    parser.add_argument("--solvers", choices=sorted(SOLVERS), nargs="+", default=sorted(SOLVERS))
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0], help="random seeds, one run each (default: 0)")
+    parser.add_argument("--time-limit", type=float, default=10.0, help="seconds per run (default: 10)")
+    parser.add_argument("--init", choices=INIT_METHODS, default="density",
+                        help="initial solution of the local searches (default: density)")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the compiled problem cache")
+    parser.add_argument("--output", default="output_benchmark", help="folder of the reports (default: output_benchmark)")
+    parser.add_argument("--baseline", help="previous JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.05,
+                        help="relative drop reported as a regression (default: 0.05)")
+    parser.add_argument("--ga-workers", type=int, nargs="+", default=[1], metavar="N",
+                        help="run the GA once per N fitness evaluation processes and print the speedup (default: 1)")
+    parser.add_argument("--synthetic", type=int, nargs="+", metavar="SCALE",
+                        help="benchmark generated instances SCALE times the base size instead of dataset/ "
+                             "and print how the measurements scale")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        input_paths = synthetic_instances(args.synthetic, os.path.join(args.output, "instances"))
+    elif args.instances:
+        input_paths = [os.path.join("dataset", name) for name in args.instances]
+    else:
+        input_paths = sorted(glob.glob(os.path.join("dataset", "*.in")))
+    for input_path in input_paths:
+        if not os.path.exists(input_path):
+            print(f"Error: {os.path.basename(input_path)} not found in dataset/")
+            return
+
+    results = benchmark(args.solvers, input_paths, args.seeds, args.time_limit, args.init, not args.no_cache,
+                        args.ga_workers)
+    settings = {"time_limit": args.time_limit, "seeds": args.seeds, "init": args.init, "ga_workers": args.ga_workers}
+    if args.synthetic:
+        settings["synthetic"] = args.synthetic
+        print_scaling(results)
+    if "ga" in args.solvers and len(args.ga_workers) > 1:
+        print_speedup(results)
+    json_path, csv_path = save_report(results, settings, args.output)
+    print(f"Report saved to {json_path} and {csv_path}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        print(f"{regressions} regression(s) against {args.baseline}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
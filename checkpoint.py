@@ -0,0 +1,175 @@
+import json
+import os
+import time
+import zipfile
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from solution import Solution
+
+CHECKPOINT_VERSION = 2
+
+
+def pack_solution(solution):
+    """Packs a solution as {cache_id: array of video ids}, dropping empty caches."""
+    return {cache_id: array('i', videos) for cache_id, videos in solution.items() if videos}
+
+
+def unpack_solution(packed, C, X, video_sizes):
+    """Rebuilds a Solution from pack_solution() output."""
+    solution = Solution(C, X, video_sizes)
+    for cache_id, videos in packed.items():
+        solution.assign(cache_id, set(videos))
+    return solution
+
+
+def _encode(value, arrays):
+    """Turns a state value into JSON, moving solutions, NumPy arrays and pair tables to arrays.
+
+    Tuples and the non-JSON values are tagged with a one-key dict, e.g. {"$array": name}.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    name = f"a{len(arrays)}"
+    if isinstance(value, Solution):
+        # CSR layout: the videos of caches[i] are videos[offsets[i]:offsets[i + 1]]
+        packed = pack_solution(value)
+        arrays[name + ".caches"] = np.array(list(packed), dtype=np.int64)
+        arrays[name + ".offsets"] = np.cumsum([0] + [len(videos) for videos in packed.values()], dtype=np.int64)
+        arrays[name + ".videos"] = np.array([v for videos in packed.values() for v in videos], dtype=np.int64)
+        return {"$solution": name}
+    if isinstance(value, np.ndarray):
+        arrays[name] = value
+        return {"$array": name}
+    if isinstance(value, tuple):
+        return {"$tuple": [_encode(item, arrays) for item in value]}
+    if isinstance(value, list):
+        return [_encode(item, arrays) for item in value]
+    if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        return {key: _encode(item, arrays) for key, item in value.items()}
+    if isinstance(value, dict) and all(isinstance(key, tuple) for key in value):
+        # {(cache_id, video_id): count} tables: one row per entry, the value last
+        width = len(next(iter(value))) + 1 if value else 1
+        arrays[name] = np.array([key + (item,) for key, item in value.items()], dtype=np.int64).reshape(-1, width)
+        return {"$pairs": name}
+    raise TypeError(f"cannot store a {type(value).__name__} in a checkpoint")
+
+
+def _decode(value, arrays):
+    """Inverse of _encode(); solutions come back packed, as pack_solution() returns them."""
+    if isinstance(value, list):
+        return [_decode(item, arrays) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "$solution" in value:
+        name = value["$solution"]
+        offsets = arrays[name + ".offsets"].tolist()
+        videos = arrays[name + ".videos"].tolist()
+        return {cache_id: videos[offsets[i]:offsets[i + 1]]
+                for i, cache_id in enumerate(arrays[name + ".caches"].tolist())}
+    if "$array" in value:
+        return arrays[value["$array"]]
+    if "$tuple" in value:
+        return tuple(_decode(item, arrays) for item in value["$tuple"])
+    if "$pairs" in value:
+        return {tuple(row[:-1]): row[-1] for row in arrays[value["$pairs"]].tolist()}
+    return {key: _decode(item, arrays) for key, item in value.items()}
+
+
+def write_checkpoint(path, state):
+    """Writes state atomically: readers see either the previous checkpoint or the new one, never a partial file.
+
+    The file is an .npz of plain arrays plus a JSON header for the scalars, so loading it
+    cannot run code. Solution values are read back as packed dicts (see pack_solution()).
+    """
+    arrays = {}
+    header = json.dumps({"version": CHECKPOINT_VERSION, "state": _encode(state, arrays)})
+    arrays["header"] = np.frombuffer(header.encode(), dtype=np.uint8)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path, solver, instance):
+    """Loads a checkpoint written by the given solver for the given instance."""
+    try:
+        with np.load(path, allow_pickle=False) as stored:
+            arrays = {name: stored[name] for name in stored.files}
+        header = json.loads(arrays.pop("header").tobytes())
+    except (EOFError, ValueError, KeyError, zipfile.BadZipFile):
+        # Also the pickled checkpoints of older versions, which are not loaded on purpose
+        raise ValueError(f"{path}: not a checkpoint of version {CHECKPOINT_VERSION}") from None
+    if header.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"{path}: unsupported checkpoint version {header.get('version')}")
+    state = _decode(header["state"], arrays)
+    if state["solver"] != solver or state["instance"] != instance:
+        raise ValueError(f"{path} was written by {state['solver']} for {state['instance']}, "
+                         f"not by {solver} for {instance}")
+    return state
+
+
+def checkpoint_path(output_folder, input_filename):
+    """Default checkpoint location of a solver run, next to its .out file."""
+    return os.path.join(output_folder, input_filename.replace(".in", ".ckpt"))
+
+
+class Checkpointer:
+    """Writes solver states to one checkpoint file every interval seconds.
+
+    Solvers poll due() from their periodic checks and pass a snapshot to save() (solutions as
+    copy-on-write copies, so the search can go on changing its own); packing and writing happen on a background thread. A checkpoint that comes due while the
+    previous one is still being written is skipped.
+    """
+
+    def __init__(self, path, solver, instance, interval=60.0):
+        self.path = path
+        self.solver = solver
+        self.instance = instance
+        self.interval = interval
+        self._next = time.perf_counter() + interval
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = None
+
+    def due(self):
+        return time.perf_counter() >= self._next
+
+    def save(self, state):
+        """Queues state for writing, unless a previous write is still running."""
+        self._next = time.perf_counter() + self.interval
+        if self._pending is not None and not self._pending.done():
+            return
+        if self._pending is not None:
+            self._pending.result()  # Surfaces errors of the previous write
+        state = dict(state, solver=self.solver, instance=self.instance)
+        self._pending = self._executor.submit(write_checkpoint, self.path, state)
+
+    def close(self, state=None):
+        """Waits for the pending write, then writes state (if given) synchronously."""
+        self._executor.shutdown(wait=True)
+        if self._pending is not None:
+            self._pending.result()
+        if state is not None:
+            write_checkpoint(self.path, dict(state, solver=self.solver, instance=self.instance))
+
+
+def add_arguments(parser):
+    """Adds the checkpoint options to a solver's command line."""
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint of a previous run")
+    parser.add_argument("--checkpoint-interval", type=float, default=60.0, metavar="SECONDS",
+                        help="seconds between checkpoints (0 disables them, default: 60)")
+
+
+def from_args(args, path, solver, instance):
+    """Returns (Checkpointer or None, resumed state or None) for the command line options."""
+    resume = load_checkpoint(path, solver, instance) if args.resume else None
+    checkpointer = None
+    if args.checkpoint_interval > 0:
+        checkpointer = Checkpointer(path, solver, instance, args.checkpoint_interval)
+    return checkpointer, resume
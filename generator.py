@@ -0,0 +1,96 @@
+import argparse
+import math
+import os
+import numpy as np
+
+# Scale 1 has the sizes of trending_today, the largest instance of dataset/
+BASE_SIZES = {"V": 10000, "E": 100, "R": 100000, "C": 100, "X": 50000}
+MAX_CACHES = 1000  # Largest C the input format allows
+
+
+def generate_instance(V, E, R, C, X, density=0.5, zipf=1.0, max_video_size=1000, seed=0):
+    """Generates a random instance in the layout returned by parse_input().
+
+    Each endpoint is connected to each cache with probability density, through a link faster
+    than its data center. Requested videos follow a Zipf law of exponent zipf over a random
+    popularity ranking (0 gives uniform popularity), so a few videos draw most requests.
+    The same arguments and seed always give the same instance.
+    """
+    rng = np.random.default_rng(seed)
+    video_sizes = rng.integers(1, max_video_size, size=V, endpoint=True)
+
+    endpoints = []
+    dc_latencies = rng.integers(2, 4000, size=E, endpoint=True)
+    degrees = rng.binomial(C, density, size=E)
+    for dc_latency, degree in zip(dc_latencies.tolist(), degrees.tolist()):
+        caches = rng.choice(C, size=degree, replace=False).tolist()
+        latencies = rng.integers(1, dc_latency, size=degree).tolist()
+        endpoints.append((dc_latency, dict(zip(caches, latencies))))
+
+    # Zipf popularity: the video of rank k gets a weight of 1 / k**zipf
+    weights = 1.0 / np.arange(1, V + 1) ** zipf
+    ranking = rng.permutation(V)
+    request_videos = ranking[rng.choice(V, size=R, p=weights / weights.sum())]
+    request_endpoints = rng.integers(0, E, size=R)
+    request_counts = rng.integers(1, 1000, size=R, endpoint=True)
+    requests = list(zip(request_videos.tolist(), request_endpoints.tolist(), request_counts.tolist()))
+
+    return V, E, R, C, X, video_sizes.tolist(), endpoints, requests
+
+
+def write_instance(file_path, V, E, R, C, X, video_sizes, endpoints, requests):
+    """Writes an instance in the HashCode 2017 .in format."""
+    lines = [f"{V} {E} {R} {C} {X}", " ".join(map(str, video_sizes))]
+    for dc_latency, caches in endpoints:
+        lines.append(f"{dc_latency} {len(caches)}")
+        lines.extend(f"{cache_id} {latency}" for cache_id, latency in caches.items())
+    lines.extend(f"{video_id} {endpoint_id} {num_requests}" for video_id, endpoint_id, num_requests in requests)
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    with open(file_path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def scaled_parameters(scale):
+    """Instance parameters scale times the size of trending_today, the largest instance of dataset/.
+
+    V, E and R grow linearly. C grows with the square root of scale, up to MAX_CACHES, and the
+    cache capacity X stays the same.
+    """
+    return {"V": BASE_SIZES["V"] * scale, "E": BASE_SIZES["E"] * scale, "R": BASE_SIZES["R"] * scale,
+            "C": min(round(BASE_SIZES["C"] * math.sqrt(scale)), MAX_CACHES), "X": BASE_SIZES["X"]}
+
+
+def main():
+    """Main function to generate a synthetic instance."""
+    parser = argparse.ArgumentParser(description="Generates a synthetic HashCode 2017 instance.")
+    parser.add_argument("output_file", help="path of the .in file to write, e.g. dataset/synthetic.in")
+    parser.add_argument("--videos", type=int, default=BASE_SIZES["V"], help="number of videos V (default: 10000)")
+    parser.add_argument("--endpoints", type=int, default=BASE_SIZES["E"], help="number of endpoints E (default: 100)")
+    parser.add_argument("--requests", type=int, default=BASE_SIZES["R"],
+                        help="number of request lines R (default: 100000)")
+    parser.add_argument("--caches", type=int, default=BASE_SIZES["C"], help="number of caches C (default: 100)")
+    parser.add_argument("--capacity", type=int, default=BASE_SIZES["X"], help="cache capacity X in MB (default: 50000)")
+    parser.add_argument("--scale", type=int,
+                        help="use SCALE times the sizes of trending_today (V, E and R times SCALE, C times "
+                             "sqrt(SCALE) up to 1000) instead of the options above")
+    parser.add_argument("--density", type=float, default=0.5,
+                        help="probability that an endpoint is connected to a cache (default: 0.5)")
+    parser.add_argument("--zipf", type=float, default=1.0,
+                        help="Zipf exponent of the video popularity, 0 for uniform (default: 1.0)")
+    parser.add_argument("--max-video-size", type=int, default=1000, help="largest video in MB (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    args = parser.parse_args()
+
+    if args.scale is not None:
+        sizes = scaled_parameters(args.scale)
+    else:
+        sizes = {"V": args.videos, "E": args.endpoints, "R": args.requests, "C": args.caches, "X": args.capacity}
+    instance = generate_instance(**sizes, density=args.density, zipf=args.zipf,
+                                 max_video_size=args.max_video_size, seed=args.seed)
+    write_instance(args.output_file, *instance)
+    print(f"Generated {args.output_file}: V={sizes['V']} E={sizes['E']} R={sizes['R']} C={sizes['C']} X={sizes['X']}")
+
+
+if __name__ == "__main__":
+    main()
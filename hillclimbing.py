@@ -1,60 +1,14 @@
+import argparse
 import os
-import sys
 import random
-
-def parse_input(file_path):
-    """Parses the input file and returns problem data."""
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
-    
-    # Read first line (problem parameters)
-    V, E, R, C, X = map(int, lines[0].split())  # Videos, Endpoints, Requests, Caches, Cache Size
-    
-    # Read video sizes
-    video_sizes = list(map(int, lines[1].split()))
-    
-    # Read endpoints
-    endpoints = []
-    line_idx = 2
-    for _ in range(E):
-        data_center_latency, num_cache_connections = map(int, lines[line_idx].split())
-        line_idx += 1
-        caches = {}
-        for _ in range(num_cache_connections):
-            cache_id, latency = map(int, lines[line_idx].split())
-            caches[cache_id] = latency
-            line_idx += 1
-        endpoints.append((data_center_latency, caches))
-    
-    # Read request descriptions
-    requests = []
-    for _ in range(R):
-        video_id, endpoint_id, num_requests = map(int, lines[line_idx].split())
-        requests.append((video_id, endpoint_id, num_requests))
-        line_idx += 1
-    
-    return V, E, R, C, X, video_sizes, endpoints, requests
-
-
-def initialize_solution(V, C, X, video_sizes, requests):
-    """Generates an initial greedy solution."""
-    cache_videos = {i: set() for i in range(C)}
-    
-    # Sort videos by total request count (most requested first)
-    video_popularity = {v: 0 for v in range(V)}
-    for video_id, _, num_requests in requests:
-        video_popularity[video_id] += num_requests
-    
-    sorted_videos = sorted(video_popularity, key=lambda v: -video_popularity[v])
-    
-    # Greedily allocate videos to caches if they fit
-    for video in sorted_videos:
-        for cache in range(C):
-            if sum(video_sizes[v] for v in cache_videos[cache]) + video_sizes[video] <= X:
-                cache_videos[cache].add(video)
-    
-    return cache_videos
-
+import time
+from itertools import count
+from initialization import INIT_METHODS, build_solution
+from problem import parse_input
+from scoring import ScoreEngine
+from solution import load_solution
+import checkpoint
+import telemetry
 
 def compute_score(cache_videos, video_sizes, endpoints, requests):
     """Computes the total score of the current solution."""
@@ -76,33 +30,74 @@ def compute_score(cache_videos, video_sizes, endpoints, requests):
     return (total_saved_time * 1000) // total_requests if total_requests > 0 else 0
 
 
-def hill_climb(cache_videos, V, C, X, video_sizes, endpoints, requests, max_iters=10000):
+def hill_climb(cache_videos, V, C, X, video_sizes, endpoints, requests, max_iters=10000, time_limit=None,
+               progress=None, run_telemetry=None, checkpointer=None, resume=None):
     """Performs hill climbing to optimize cache allocation."""
-    current_score = compute_score(cache_videos, video_sizes, endpoints, requests)
+    engine = ScoreEngine(cache_videos, endpoints, requests)
+    current_score = engine.score()
+    
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
     
-    for _ in range(max_iters):
+    start = 0
+    if resume is not None:
+        start = resume["iteration"]
+        random.setstate(resume["rng"])
+    
+    iteration = start
+    next_iteration = start  # First iteration not run yet, where a resumed run goes on
+    tried = accepted = infeasible = 0
+    if run_telemetry is not None:
+        run_telemetry.lap("setup")
+    for iteration in (range(start, max_iters) if max_iters is not None else count(start)):
+        if run_telemetry is not None:
+            run_telemetry.lap("scoring")
+        if iteration % 256 == 0:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if checkpointer is not None and checkpointer.due():
+                checkpointer.save({"iteration": iteration, "rng": random.getstate(), "solution": cache_videos.copy()})
+            if run_telemetry is not None:
+                run_telemetry.update(iteration, current_score, current_score, tried=tried, accepted=accepted,
+                                     rejected=tried - accepted - infeasible, infeasible=infeasible)
+        next_iteration = iteration + 1
+        
         cache_id = random.randint(0, C - 1)
         video_id = random.randint(0, V - 1)
+        if run_telemetry is not None:
+            run_telemetry.lap("moves")
+        tried += 1
         
         if video_id in cache_videos[cache_id]:
             # Try removing the video
-            cache_videos[cache_id].remove(video_id)
+            new_score = engine.score(engine.saved - engine.removal_loss(cache_id, video_id))
+            if new_score >= current_score:
+                engine.remove(cache_id, video_id)
+                accepted += 1
+                if progress is not None and new_score > current_score:
+                    progress(iteration, new_score)
+                current_score = new_score
         else:
-            # Try adding the video if space allows
-            if sum(video_sizes[v] for v in cache_videos[cache_id]) + video_sizes[video_id] <= X:
-                cache_videos[cache_id].add(video_id)
-        
-        new_score = compute_score(cache_videos, video_sizes, endpoints, requests)
-        
-        if new_score < current_score:
-            # Revert the change if score worsened
-            if video_id in cache_videos[cache_id]:
-                cache_videos[cache_id].remove(video_id)
+            # Try adding the video, evicting the cheapest videos if the cache is full
+            delta, evicted = engine.best_swap(cache_id, video_id)
+            if delta is None:
+                infeasible += 1
             else:
-                cache_videos[cache_id].add(video_id)
-        else:
-            current_score = new_score  # Accept improvement
+                new_score = engine.score(engine.saved + delta)
+                if new_score >= current_score:
+                    engine.swap(cache_id, video_id, evicted)
+                    accepted += 1
+                    if progress is not None and new_score > current_score:
+                        progress(iteration, new_score)
+                    current_score = new_score
     
+    if run_telemetry is not None:
+        run_telemetry.lap("scoring")
+        run_telemetry.update(iteration, current_score, current_score, tried=tried, accepted=accepted,
+                             rejected=tried - accepted - infeasible, infeasible=infeasible)
+    if checkpointer is not None:
+        checkpointer.close({"iteration": next_iteration, "rng": random.getstate(), "solution": cache_videos.copy()})
+    if progress is not None:
+        progress(iteration, current_score)
     return cache_videos
 
 
@@ -117,11 +112,22 @@ def save_solution(cache_videos, output_file):
 
 def main():
     """Main function to execute the hill-climbing algorithm."""
-    if len(sys.argv) < 2:
-        print("Usage: python3 hillclimbing.py <input_file>")
-        return
+    parser = argparse.ArgumentParser(description="Optimizes a HashCode 2017 instance from dataset/ with hill-climbing.")
+    parser.add_argument("input_file", help="name of the .in file inside dataset/")
+    parser.add_argument("--init", choices=INIT_METHODS, default="density",
+                        help="initial solution builder (default: density)")
+    parser.add_argument("--init-from", metavar="FILE",
+                        help="start from an existing .out solution instead of building one")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the compiled problem cache")
+    parser.add_argument("--max-iters", type=int, default=10000, help="moves to try (default: 10000)")
+    parser.add_argument("--time-limit", type=float, help="seconds to run, replaces --max-iters")
+    telemetry.add_arguments(parser)
+    checkpoint.add_arguments(parser)
+    args = parser.parse_args()
+    if args.init_from and args.resume:
+        parser.error("--init-from and --resume are exclusive")
     
-    input_filename = sys.argv[1]
+    input_filename = args.input_file
     input_path = os.path.join("dataset", input_filename)
     output_folder = "output_hill"
     os.makedirs(output_folder, exist_ok=True)
@@ -131,18 +137,42 @@ def main():
         return
 
     output_path = os.path.join(output_folder, input_filename.replace(".in", ".out"))
+    checkpoint_file = checkpoint.checkpoint_path(output_folder, input_filename)
+    if args.resume and not os.path.exists(checkpoint_file):
+        print(f"Error: no checkpoint to resume from at {checkpoint_file}")
+        return
+    checkpointer, resume = checkpoint.from_args(args, checkpoint_file, "hill", input_filename)
 
-    # Parse input
-    V, E, R, C, X, video_sizes, endpoints, requests = parse_input(input_path)
+    run_telemetry = telemetry.from_args(args, "hill")
 
-    # Generate initial greedy solution
-    cache_videos = initialize_solution(V, C, X, video_sizes, requests)
+    # Parse input
+    with telemetry.timed(run_telemetry, "io"):
+        V, E, R, C, X, video_sizes, endpoints, requests = parse_input(input_path, use_cache=not args.no_cache)
+
+    # Generate initial greedy solution, or continue from the checkpoint
+    with telemetry.timed(run_telemetry, "init"):
+        if resume is not None:
+            cache_videos = checkpoint.unpack_solution(resume["solution"], C, X, video_sizes)
+        elif args.init_from:
+            try:
+                cache_videos = load_solution(args.init_from, C, X, video_sizes)
+            except (OSError, ValueError) as e:
+                print(f"Error: cannot start from {args.init_from}: {e}")
+                return
+        else:
+            cache_videos = build_solution(args.init, V, C, X, video_sizes, endpoints, requests)
 
     # Optimize using hill climbing
-    optimized_cache_videos = hill_climb(cache_videos, V, C, X, video_sizes, endpoints, requests)
+    max_iters = None if args.time_limit is not None else args.max_iters
+    optimized_cache_videos = hill_climb(cache_videos, V, C, X, video_sizes, endpoints, requests,
+                                        max_iters=max_iters, time_limit=args.time_limit, run_telemetry=run_telemetry,
+                                        checkpointer=checkpointer, resume=resume)
 
     # Save the solution
-    save_solution(optimized_cache_videos, output_path)
+    with telemetry.timed(run_telemetry, "io"):
+        save_solution(optimized_cache_videos, output_path)
+    if run_telemetry is not None:
+        run_telemetry.close()
 
     print(f"Processed {input_filename}, output saved to {output_path}")
 
@@ -0,0 +1,65 @@
+import heapq
+from scoring import ScoreEngine
+from solution import Solution
+
+INIT_METHODS = ("density", "popularity")
+
+
+def initialize_solution(V, C, X, video_sizes, requests):
+    """Generates an initial greedy solution."""
+    cache_videos = Solution(C, X, video_sizes)
+
+    # Sort videos by total request count (most requested first)
+    video_popularity = {v: 0 for v in range(V)}
+    for video_id, _, num_requests in requests:
+        video_popularity[video_id] += num_requests
+
+    sorted_videos = sorted(video_popularity, key=lambda v: -video_popularity[v])
+
+    # Greedily allocate videos to caches if they fit
+    for video in sorted_videos:
+        for cache in range(C):
+            if cache_videos.fits(cache, video):
+                cache_videos.add(cache, video)
+
+    return cache_videos
+
+
+def density_greedy_solution(C, X, video_sizes, endpoints, requests):
+    """Greedily places the (cache, video) pairs with the most latency saved per MB first."""
+    cache_videos = Solution(C, X, video_sizes)
+    engine = ScoreEngine(cache_videos, endpoints, requests)
+
+    # Gain of every candidate against the empty solution
+    gains = {key: gain for key, gain in engine.potential_gains().items() if video_sizes[key[1]] <= X}
+
+    # A candidate only goes stale when its video is placed in another cache,
+    # so each entry remembers how many placements its video had when it was scored
+    placements = {}
+    heap = [(-gain / video_sizes[video_id], cache_id, video_id, 0) for (cache_id, video_id), gain in gains.items()]
+    heapq.heapify(heap)
+
+    while heap:
+        _, cache_id, video_id, version = heapq.heappop(heap)
+        if not cache_videos.fits(cache_id, video_id):
+            continue  # Caches only fill up, so this candidate can never fit again
+        current_version = placements.get(video_id, 0)
+        if version != current_version:
+            gain = engine.addition_gain(cache_id, video_id)
+            if gain <= 0:
+                continue
+            heapq.heappush(heap, (-gain / video_sizes[video_id], cache_id, video_id, current_version))
+            continue
+        engine.add(cache_id, video_id)
+        placements[video_id] = current_version + 1
+
+    return cache_videos
+
+
+def build_solution(method, V, C, X, video_sizes, endpoints, requests):
+    """Builds an initial solution with the named method."""
+    if method == "popularity":
+        return initialize_solution(V, C, X, video_sizes, requests)
+    if method == "density":
+        return density_greedy_solution(C, X, video_sizes, endpoints, requests)
+    raise ValueError(f"Unknown initialization method: {method}")
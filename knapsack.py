@@ -0,0 +1,155 @@
+import argparse
+import os
+import numpy as np
+from hillclimbing import compute_score, save_solution
+from problem import parse_input
+from scoring import ScoreEngine
+from solution import Solution, load_solution
+
+
+def knapsack(sizes, values, capacity):
+    """Solves a 0/1 knapsack exactly and returns (best value, indices of the chosen items).
+
+    Items that cannot beat the greedy solution even with the LP relaxation of the rest are
+    discarded first; the remaining ones go through a size-indexed DP whose take/skip
+    decisions are stored as packed bits for the reconstruction.
+    """
+    sizes = np.asarray(sizes, dtype=np.int64)
+    values = np.asarray(values, dtype=np.int64)
+    items = np.flatnonzero((sizes <= capacity) & (values > 0))
+    if len(items) == 0:
+        return 0, []
+
+    # Greedy by density gives a lower bound, its prefix sums give the LP bound
+    order = items[np.argsort(-values[items] / sizes[items], kind="stable")]
+    prefix_sizes = np.concatenate(([0], np.cumsum(sizes[order])))
+    prefix_values = np.concatenate(([0], np.cumsum(values[order])))
+    greedy, used = [], 0
+    for i in order.tolist():
+        if used + sizes[i] <= capacity:
+            greedy.append(i)
+            used += sizes[i]
+    greedy_value = int(values[greedy].sum())
+
+    def lp_bound(room):
+        # Value of the fractional knapsack over all items for each capacity in room
+        k = np.searchsorted(prefix_sizes, room, side="right") - 1
+        partial = np.zeros(len(room))
+        has_next = k < len(order)
+        nxt = order[np.minimum(k, len(order) - 1)]
+        partial[has_next] = (room[has_next] - prefix_sizes[k][has_next]) * values[nxt][has_next] / sizes[nxt][has_next]
+        return prefix_values[k] + partial
+
+    # An item is only useful if taking it can still beat the greedy value
+    useful = values[order] + lp_bound(capacity - sizes[order]) > greedy_value
+    core = order[useful]
+
+    dp = np.zeros(capacity + 1, dtype=np.int64)
+    decisions = []
+    for i in core.tolist():
+        size, value = int(sizes[i]), int(values[i])
+        candidate = dp[:capacity + 1 - size] + value
+        better = candidate > dp[size:]
+        np.maximum(dp[size:], candidate, out=dp[size:])
+        decisions.append(np.packbits(better))
+
+    if int(dp[capacity]) <= greedy_value:
+        return greedy_value, greedy
+
+    chosen, room = [], capacity
+    for i, bits in zip(reversed(core.tolist()), reversed(decisions)):
+        size = int(sizes[i])
+        offset = room - size
+        if offset >= 0 and (bits[offset >> 3] >> (7 - (offset & 7))) & 1:
+            chosen.append(i)
+            room -= size
+    return int(dp[capacity]), chosen
+
+
+def upper_bound(C, X, video_sizes, endpoints, requests):
+    """Returns an upper bound on the total saved time of any solution.
+
+    Each cache gets its own knapsack over optimistic gains (a video placed in a cache is
+    assumed to serve every connected request from it), and the result is capped by the
+    saving obtained if every request used its fastest cache.
+    """
+    engine = ScoreEngine(Solution(C, X, video_sizes), endpoints, requests)
+    gains = engine.potential_gains()
+    per_cache = {}
+    for (cache_id, video_id), gain in gains.items():
+        per_cache.setdefault(cache_id, ([], []))
+        per_cache[cache_id][0].append(video_sizes[video_id])
+        per_cache[cache_id][1].append(gain)
+    knapsack_bound = sum(knapsack(sizes, values, X)[0] for sizes, values in per_cache.values())
+
+    fastest_bound = 0
+    for pair, endpoint_id in enumerate(engine.pair_endpoint):
+        links = engine.endpoint_links[endpoint_id]
+        if links:
+            fastest_bound += (endpoints[endpoint_id][0] - links[0][0]) * engine.pair_count[pair]
+
+    return min(knapsack_bound, fastest_bound), engine.total_requests
+
+
+def knapsack_solution(C, X, video_sizes, endpoints, requests):
+    """Fills caches one at a time with an exact knapsack over the gains left by the caches already fixed."""
+    solution = Solution(C, X, video_sizes)
+    engine = ScoreEngine(solution, endpoints, requests)
+    gains = engine.potential_gains()
+    candidates = engine.candidate_index(max_size=X, gains=gains)
+
+    # Caches with the most potential go first, while the gains are still high
+    potential = {}
+    for (cache_id, _), gain in gains.items():
+        potential[cache_id] = potential.get(cache_id, 0) + gain
+    for cache_id in sorted(candidates, key=lambda c: -potential[c]):
+        videos = candidates[cache_id]
+        values = [engine.addition_gain(cache_id, video_id) for video_id in videos]
+        _, chosen = knapsack([video_sizes[v] for v in videos], values, X)
+        for i in chosen:
+            engine.add(cache_id, videos[i])
+    return solution
+
+
+def main():
+    """Main function to compute the knapsack upper bound and solution of an instance."""
+    parser = argparse.ArgumentParser(description="Bounds a HashCode 2017 instance from dataset/ with per-cache knapsacks.")
+    parser.add_argument("input_file", help="name of the .in file inside dataset/")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the compiled problem cache")
+    args = parser.parse_args()
+
+    input_filename = args.input_file
+    input_path = os.path.join("dataset", input_filename)
+    output_folder = "output_knapsack"
+    os.makedirs(output_folder, exist_ok=True)
+
+    if not os.path.exists(input_path):
+        print(f"Error: {input_filename} not found in dataset/")
+        return
+
+    output_path = os.path.join(output_folder, input_filename.replace(".in", ".out"))
+
+    V, E, R, C, X, video_sizes, endpoints, requests = parse_input(input_path, use_cache=not args.no_cache)
+
+    bound, total_requests = upper_bound(C, X, video_sizes, endpoints, requests)
+    bound_score = (bound * 1000) // total_requests if total_requests > 0 else 0
+    print(f"Upper bound: {bound_score}")
+
+    cache_videos = knapsack_solution(C, X, video_sizes, endpoints, requests)
+    save_solution(cache_videos, output_path)
+    print(f"Processed {input_filename}, output saved to {output_path}")
+    final_score = compute_score(cache_videos, video_sizes, endpoints, requests)
+    print(f"Final score: {final_score} ({100 * final_score / bound_score:.2f}% of the bound)" if bound_score else
+          f"Final score: {final_score}")
+
+    # Gap of the solutions already produced by the other solvers
+    for folder in ("output_hill", "output_tabu", "output_sa"):
+        existing = os.path.join(folder, input_filename.replace(".in", ".out"))
+        if os.path.exists(existing):
+            score = compute_score(load_solution(existing, C, X, video_sizes), video_sizes, endpoints, requests)
+            gap = f" ({100 * score / bound_score:.2f}% of the bound)" if bound_score else ""
+            print(f"{existing}: {score}{gap}")
+
+
+if __name__ == "__main__":
+    main()
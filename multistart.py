@@ -0,0 +1,93 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from hillclimbing import compute_score, save_solution
+from initialization import INIT_METHODS, build_solution
+from problem import parse_input
+from solvers import SOLVERS
+
+# Problem data and initial solutions of the current worker process
+_worker = {}
+
+
+def _init_worker(input_path, use_cache):
+    """Parses the instance once per worker process."""
+    _worker["problem"] = parse_input(input_path, use_cache=use_cache)
+    _worker["initial"] = {}
+
+
+def _run(solver, init, seed, max_iters, time_limit):
+    """Runs one restart and returns its score and solution as {cache_id: [video ids]}."""
+    V, E, R, C, X, video_sizes, endpoints, requests = _worker["problem"]
+    # Initializers are deterministic, so each worker builds them once and restarts copy them
+    if init not in _worker["initial"]:
+        _worker["initial"][init] = build_solution(init, V, C, X, video_sizes, endpoints, requests)
+    cache_videos = _worker["initial"][init].copy()
+
+    random.seed(seed)
+    start = time.perf_counter()
+    search, _ = SOLVERS[solver]
+    solution = search(cache_videos, V, C, X, video_sizes, endpoints, requests,
+                      max_iters=max_iters, time_limit=time_limit)
+    elapsed = time.perf_counter() - start
+    score = compute_score(solution, video_sizes, endpoints, requests)
+    return seed, init, score, elapsed, {cache_id: list(videos) for cache_id, videos in solution.items()}
+
+
+def multi_start(input_path, solver, restarts, workers, inits=("density",), seed=0, max_iters=10000,
+                time_limit=None, use_cache=True):
+    """Runs independent restarts over a process pool and returns (score, solution) of the best one."""
+    best_score, best_solution = -1, None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(input_path, use_cache)) as executor:
+        futures = [executor.submit(_run, solver, inits[i % len(inits)], seed + i, max_iters, time_limit)
+                   for i in range(restarts)]
+        for done, future in enumerate(as_completed(futures), start=1):
+            run_seed, init, score, elapsed, solution = future.result()
+            marker = ""
+            if score > best_score:
+                best_score, best_solution = score, solution
+                marker = " (best)"
+            print(f"[{done}/{restarts}] seed={run_seed} init={init} score={score} time={elapsed:.2f}s{marker}",
+                  flush=True)
+    return best_score, best_solution
+
+
+def main():
+    """Main function to execute several independent restarts of a local search."""
+    parser = argparse.ArgumentParser(description="Runs N independent restarts of a local search and keeps the best.")
+    parser.add_argument("input_file", help="name of the .in file inside dataset/")
+    parser.add_argument("--solver", choices=sorted(SOLVERS), default="hill")
+    parser.add_argument("--restarts", type=int, default=8, help="number of independent runs (default: 8)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument("--init", choices=INIT_METHODS, nargs="+", default=["density"],
+                        help="initializers used in turn by the restarts (default: density)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first restart, the others use seed+1, ...")
+    parser.add_argument("--max-iters", type=int, default=10000, help="moves per restart (default: 10000)")
+    parser.add_argument("--time-limit", type=float, help="seconds per restart, replaces --max-iters")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the compiled problem cache")
+    args = parser.parse_args()
+
+    input_filename = args.input_file
+    input_path = os.path.join("dataset", input_filename)
+    if not os.path.exists(input_path):
+        print(f"Error: {input_filename} not found in dataset/")
+        return
+
+    _, output_folder = SOLVERS[args.solver]
+    os.makedirs(output_folder, exist_ok=True)
+    output_path = os.path.join(output_folder, input_filename.replace(".in", ".out"))
+
+    max_iters = None if args.time_limit is not None else args.max_iters
+    best_score, best_solution = multi_start(input_path, args.solver, args.restarts, args.workers, args.init,
+                                            args.seed, max_iters, args.time_limit, not args.no_cache)
+
+    save_solution(best_solution, output_path)
+    print(f"Processed {input_filename}, output saved to {output_path}")
+    print(f"Final score: {best_score}")
+
+
+if __name__ == "__main__":
+    main()
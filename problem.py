@@ -0,0 +1,143 @@
+import hashlib
+import os
+import zipfile
+from array import array
+import numpy as np
+
+CACHE_DIRNAME = ".cache"
+CACHE_VERSION = 2
+# Arrays of a Problem, stored as int64 arrays in the compiled cache
+ARRAY_FIELDS = ("video_sizes", "dc_latency", "ep_offsets", "ep_caches", "ep_latencies",
+                "req_video", "req_endpoint", "req_count")
+
+
+class Problem:
+    """Flat array representation of a HashCode 2017 instance."""
+
+    def __init__(self, V, E, R, C, X, video_sizes, dc_latency, ep_offsets, ep_caches, ep_latencies,
+                 req_video, req_endpoint, req_count):
+        self.V, self.E, self.R, self.C, self.X = V, E, R, C, X
+        self.video_sizes = video_sizes  # array of V sizes
+        self.dc_latency = dc_latency  # array of E data center latencies
+        # CSR layout: the links of endpoint e are ep_caches/ep_latencies[ep_offsets[e]:ep_offsets[e + 1]]
+        self.ep_offsets = ep_offsets
+        self.ep_caches = ep_caches
+        self.ep_latencies = ep_latencies
+        self.req_video = req_video
+        self.req_endpoint = req_endpoint
+        self.req_count = req_count
+
+    @property
+    def endpoints(self):
+        """Returns endpoints as (data_center_latency, {cache_id: latency}) tuples."""
+        offsets = self.ep_offsets
+        return [
+            (self.dc_latency[e],
+             dict(zip(self.ep_caches[offsets[e]:offsets[e + 1]], self.ep_latencies[offsets[e]:offsets[e + 1]])))
+            for e in range(self.E)
+        ]
+
+    @property
+    def requests(self):
+        """Returns requests as (video_id, endpoint_id, num_requests) tuples."""
+        return list(zip(self.req_video, self.req_endpoint, self.req_count))
+
+    def unpack(self):
+        """Returns the problem in the tuple layout used by the solvers."""
+        return self.V, self.E, self.R, self.C, self.X, list(self.video_sizes), self.endpoints, self.requests
+
+
+def read_problem(data):
+    """Tokenizes the raw bytes of an .in file in a single pass and builds a Problem."""
+    tokens = array('q', map(int, data.split()))
+    V, E, R, C, X = tokens[:5]
+    idx = 5
+
+    video_sizes = tokens[idx:idx + V]
+    idx += V
+
+    dc_latency = array('q', bytes(8 * E))
+    ep_offsets = array('q', bytes(8 * (E + 1)))
+    link_starts = []
+    for e in range(E):
+        dc_latency[e] = tokens[idx]
+        num_cache_connections = tokens[idx + 1]
+        link_starts.append((idx + 2, num_cache_connections))
+        ep_offsets[e + 1] = ep_offsets[e] + num_cache_connections
+        idx += 2 + 2 * num_cache_connections
+
+    ep_caches = array('q')
+    ep_latencies = array('q')
+    for start, num_cache_connections in link_starts:
+        end = start + 2 * num_cache_connections
+        ep_caches.extend(tokens[start:end:2])
+        ep_latencies.extend(tokens[start + 1:end:2])
+
+    end = idx + 3 * R
+    req_video = tokens[idx:end:3]
+    req_endpoint = tokens[idx + 1:end:3]
+    req_count = tokens[idx + 2:end:3]
+
+    return Problem(V, E, R, C, X, video_sizes, dc_latency, ep_offsets, ep_caches, ep_latencies,
+                   req_video, req_endpoint, req_count)
+
+
+def _cache_path(file_path, digest):
+    directory = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIRNAME)
+    return os.path.join(directory, f"{os.path.basename(file_path)}.{digest}.npz")
+
+
+def _read_cache(cache_path):
+    """Returns the Problem stored in a compiled cache file, or None if it is missing, stale or damaged."""
+    try:
+        # Plain arrays only: a tampered file cannot run code when loaded
+        with np.load(cache_path, allow_pickle=False) as stored:
+            header = stored["header"].tolist()
+            if len(header) != 6 or header[0] != CACHE_VERSION:
+                return None
+            fields = []
+            for name in ARRAY_FIELDS:
+                values = array('q')
+                values.frombytes(stored[name].astype(np.int64, copy=False).tobytes())
+                fields.append(values)
+    except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+    return Problem(*header[1:], *fields)
+
+
+def _write_cache(cache_path, problem):
+    """Writes a Problem to a compiled cache file, atomically."""
+    arrays = {name: np.frombuffer(getattr(problem, name), dtype=np.int64) for name in ARRAY_FIELDS}
+    arrays["header"] = np.array([CACHE_VERSION, problem.V, problem.E, problem.R, problem.C, problem.X],
+                                dtype=np.int64)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, cache_path)
+
+
+def load_problem(file_path, use_cache=True):
+    """Loads an .in file, reusing a compiled copy keyed by the file hash when available."""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if not use_cache:
+        return read_problem(data)
+
+    digest = hashlib.sha1(data).hexdigest()[:16]
+    cache_path = _cache_path(file_path, digest)
+    problem = _read_cache(cache_path)
+    if problem is not None:
+        return problem
+
+    problem = read_problem(data)
+    try:
+        _write_cache(cache_path, problem)
+    except OSError:
+        pass  # The cache is only an optimization
+    return problem
+
+
+def parse_input(file_path, use_cache=True):
+    """Parses the input file and returns problem data."""
+    return load_problem(file_path, use_cache).unpack()
@@ -0,0 +1,194 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from hillclimbing import compute_score, save_solution
+from initialization import INIT_METHODS, build_solution
+from problem import parse_input
+from solution import Solution
+from solvers import SOLVERS
+
+
+class Component:
+    """An independent part of an instance, renumbered as a problem of its own.
+
+    caches, endpoints and videos list the original ids behind local ids 0, 1, ...;
+    problem is the (V, E, R, C, X, video_sizes, endpoints, requests) tuple the solvers take.
+    """
+
+    def __init__(self, caches, endpoints, videos, problem):
+        self.caches = caches
+        self.endpoints = endpoints
+        self.videos = videos
+        self.problem = problem
+
+    def restore(self, solution, full_solution):
+        """Copies a solution of this component into a solution of the original instance."""
+        for cache_id, videos in solution.items():
+            if videos:
+                full_solution.assign(self.caches[cache_id], {self.videos[video_id] for video_id in videos})
+
+
+def aggregate_requests(X, video_sizes, endpoints, requests):
+    """Sums duplicate (video, endpoint) requests and drops those that can never save time.
+
+    A request is dropped when its video is larger than a cache or its endpoint has no cache
+    faster than the data center. Returns {(video_id, endpoint_id): num_requests}.
+    """
+    connected = [any(latency < data_center_latency for latency in caches.values())
+                 for data_center_latency, caches in endpoints]
+    pairs = {}
+    for video_id, endpoint_id, num_requests in requests:
+        if num_requests > 0 and connected[endpoint_id] and video_sizes[video_id] <= X:
+            key = (video_id, endpoint_id)
+            pairs[key] = pairs.get(key, 0) + num_requests
+    return pairs
+
+
+def _find(parent, cache_id):
+    while parent[cache_id] != cache_id:
+        parent[cache_id] = parent[parent[cache_id]]  # Path halving
+        cache_id = parent[cache_id]
+    return cache_id
+
+
+def split_components(C, X, video_sizes, endpoints, pairs):
+    """Splits the endpoint-cache graph of the requested endpoints into connected components.
+
+    Only links faster than the data center count. Caches that no requested endpoint reaches
+    belong to no component and stay empty. Returns the components, largest first.
+    """
+    requested = sorted({endpoint_id for _, endpoint_id in pairs})
+    links = {endpoint_id: [cache_id for cache_id, latency in endpoints[endpoint_id][1].items()
+                           if latency < endpoints[endpoint_id][0]]
+             for endpoint_id in requested}
+
+    # Union-find over the caches: the caches of one endpoint end up in the same set
+    parent = list(range(C))
+    for cache_ids in links.values():
+        root = _find(parent, cache_ids[0])
+        for cache_id in cache_ids[1:]:
+            other = _find(parent, cache_id)
+            if other != root:
+                parent[other] = root
+
+    groups = {}
+    for endpoint_id in requested:
+        groups.setdefault(_find(parent, links[endpoint_id][0]), []).append(endpoint_id)
+    group_pairs = {root: [] for root in groups}
+    for (video_id, endpoint_id), num_requests in pairs.items():
+        group_pairs[_find(parent, links[endpoint_id][0])].append((video_id, endpoint_id, num_requests))
+
+    components = []
+    for root, endpoint_ids in groups.items():
+        cache_ids = sorted({cache_id for endpoint_id in endpoint_ids for cache_id in links[endpoint_id]})
+        video_ids = sorted({video_id for video_id, _, _ in group_pairs[root]})
+        local_cache = {cache_id: i for i, cache_id in enumerate(cache_ids)}
+        local_video = {video_id: i for i, video_id in enumerate(video_ids)}
+        local_endpoint = {endpoint_id: i for i, endpoint_id in enumerate(endpoint_ids)}
+        local_endpoints = [(endpoints[endpoint_id][0],
+                            {local_cache[cache_id]: endpoints[endpoint_id][1][cache_id] for cache_id in links[endpoint_id]})
+                           for endpoint_id in endpoint_ids]
+        local_requests = [(local_video[video_id], local_endpoint[endpoint_id], num_requests)
+                          for video_id, endpoint_id, num_requests in group_pairs[root]]
+        problem = (len(video_ids), len(endpoint_ids), len(local_requests), len(cache_ids), X,
+                   [video_sizes[video_id] for video_id in video_ids], local_endpoints, local_requests)
+        components.append(Component(cache_ids, endpoint_ids, video_ids, problem))
+    components.sort(key=lambda component: component.problem[2], reverse=True)
+    return components
+
+
+def reduce_problem(V, E, R, C, X, video_sizes, endpoints, requests):
+    """Prunes, aggregates and decomposes an instance. Returns (components, statistics)."""
+    pairs = aggregate_requests(X, video_sizes, endpoints, requests)
+    components = split_components(C, X, video_sizes, endpoints, pairs)
+    statistics = {
+        "requests": R,
+        "pairs": len(pairs),
+        "unplaceable_videos": sum(1 for size in video_sizes if size > X),
+        "unconnected_endpoints": sum(1 for data_center_latency, caches in endpoints
+                                     if not any(latency < data_center_latency for latency in caches.values())),
+        "components": len(components),
+        "unused_caches": C - sum(len(component.caches) for component in components),
+    }
+    return components, statistics
+
+
+def restore_solution(components, solutions, C, X, video_sizes):
+    """Combines the solutions of the components into a solution of the original instance."""
+    full_solution = Solution(C, X, video_sizes)
+    for component, solution in zip(components, solutions):
+        component.restore(solution, full_solution)
+    return full_solution
+
+
+def _solve(solver, init, seed, problem, max_iters, time_limit):
+    """Solves one component and returns its solution as {cache_id: [video ids]} in local ids."""
+    V, E, R, C, X, video_sizes, endpoints, requests = problem
+    random.seed(seed)
+    cache_videos = build_solution(init, V, C, X, video_sizes, endpoints, requests)
+    search, _ = SOLVERS[solver]
+    solution = search(cache_videos, V, C, X, video_sizes, endpoints, requests,
+                      max_iters=max_iters, time_limit=time_limit)
+    return {cache_id: list(videos) for cache_id, videos in solution.items()}
+
+
+def solve_components(components, solver, workers, init="density", seed=0, max_iters=10000, time_limit=None):
+    """Solves the components independently over a process pool and returns their solutions in order."""
+    solutions = [None] * len(components)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_solve, solver, init, seed + i, component.problem, max_iters, time_limit): i
+                   for i, component in enumerate(components)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            solutions[i] = future.result()
+            print(f"[{done}/{len(components)}] component {i}: {len(components[i].caches)} caches, "
+                  f"{components[i].problem[2]} requests", flush=True)
+    return solutions
+
+
+def main():
+    """Main function to reduce an instance and solve its independent parts."""
+    parser = argparse.ArgumentParser(description="Prunes, aggregates and splits an instance into independent "
+                                                 "parts, then solves them with a local search.")
+    parser.add_argument("input_file", help="name of the .in file inside dataset/")
+    parser.add_argument("--solver", choices=sorted(SOLVERS), default="hill")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument("--init", choices=INIT_METHODS, default="density",
+                        help="initial solution builder (default: density)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first component, the others use seed+1, ...")
+    parser.add_argument("--max-iters", type=int, default=10000, help="moves per component (default: 10000)")
+    parser.add_argument("--time-limit", type=float, help="seconds per component, replaces --max-iters")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the compiled problem cache")
+    args = parser.parse_args()
+
+    input_filename = args.input_file
+    input_path = os.path.join("dataset", input_filename)
+    if not os.path.exists(input_path):
+        print(f"Error: {input_filename} not found in dataset/")
+        return
+
+    V, E, R, C, X, video_sizes, endpoints, requests = parse_input(input_path, use_cache=not args.no_cache)
+    start = time.perf_counter()
+    components, statistics = reduce_problem(V, E, R, C, X, video_sizes, endpoints, requests)
+    print(f"Reduced in {time.perf_counter() - start:.2f}s: {statistics['requests']} requests -> "
+          f"{statistics['pairs']} pairs, {statistics['unplaceable_videos']} unplaceable videos, "
+          f"{statistics['unconnected_endpoints']} unconnected endpoints, {statistics['unused_caches']} unused caches, "
+          f"{statistics['components']} component(s)")
+
+    max_iters = None if args.time_limit is not None else args.max_iters
+    solutions = solve_components(components, args.solver, args.workers, args.init, args.seed,
+                                 max_iters, args.time_limit)
+    solution = restore_solution(components, solutions, C, X, video_sizes)
+
+    _, output_folder = SOLVERS[args.solver]
+    os.makedirs(output_folder, exist_ok=True)
+    output_path = os.path.join(output_folder, input_filename.replace(".in", ".out"))
+    save_solution(solution, output_path)
+    print(f"Processed {input_filename}, output saved to {output_path}")
+    print(f"Final score: {compute_score(solution, video_sizes, endpoints, requests)}")
+
+
+if __name__ == "__main__":
+    main()
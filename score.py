@@ -0,0 +1,170 @@
+import argparse
+import glob
+import os
+import sys
+import time
+import numpy as np
+from problem import load_problem
+from solution import load_solution
+
+
+class SolutionScorer:
+    """Scores solutions of one instance with NumPy over precomputed request arrays.
+
+    Duplicate (video, endpoint) requests are merged and every remaining request is expanded
+    into one entry per cache of its endpoint that is faster than the data center, holding the
+    index of (cache, video) in the placement bitmap and the time saved per request. Scoring a
+    solution is then a gather, a mask and a per-request maximum over those entries.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        V, C = problem.V, problem.C
+        video_sizes = np.asarray(problem.video_sizes, dtype=np.int64)
+        dc_latency = np.asarray(problem.dc_latency, dtype=np.int64)
+        offsets = np.asarray(problem.ep_offsets, dtype=np.int64)
+        link_caches = np.asarray(problem.ep_caches, dtype=np.int64)
+        link_latencies = np.asarray(problem.ep_latencies, dtype=np.int64)
+        self.video_sizes = video_sizes
+
+        # Keep only the links that save time, in the same CSR layout
+        link_endpoints = np.repeat(np.arange(problem.E), np.diff(offsets))
+        link_savings = dc_latency[link_endpoints] - link_latencies
+        useful = link_savings > 0
+        link_caches, link_savings = link_caches[useful], link_savings[useful]
+        degree = np.bincount(link_endpoints[useful], minlength=problem.E)
+        offsets = np.concatenate(([0], np.cumsum(degree)))
+
+        # Merge duplicate (video, endpoint) requests
+        keys = np.asarray(problem.req_endpoint, dtype=np.int64) * V + np.asarray(problem.req_video, dtype=np.int64)
+        counts = np.asarray(problem.req_count, dtype=np.int64)
+        self.total_requests = int(counts.sum())
+        keys, inverse = np.unique(keys, return_inverse=True)
+        pair_counts = np.bincount(inverse, weights=counts).astype(np.int64)
+        pair_endpoints, pair_videos = keys // V, keys % V
+        self.requests_per_endpoint = np.bincount(pair_endpoints, weights=pair_counts, minlength=problem.E)
+
+        # Requests whose endpoint has no useful cache can never save anything
+        connected = degree[pair_endpoints] > 0
+        pair_endpoints, pair_videos, pair_counts = pair_endpoints[connected], pair_videos[connected], pair_counts[connected]
+        pair_degree = degree[pair_endpoints]
+
+        # Expand every request into the links of its endpoint
+        starts = np.concatenate(([0], np.cumsum(pair_degree)[:-1]))
+        entry_links = np.arange(int(pair_degree.sum())) - np.repeat(starts - offsets[pair_endpoints], pair_degree)
+        index_type = np.int32 if C * V < 2 ** 31 else np.int64
+        self.entry_slots = (link_caches[entry_links] * V + np.repeat(pair_videos, pair_degree)).astype(index_type)
+        self.entry_savings = link_savings[entry_links].astype(np.int32)
+        self.segment_starts = starts
+        self.pair_endpoints = pair_endpoints
+        self.pair_counts = pair_counts
+        # Saving of each request if it were always served by its fastest cache
+        self.best_possible = np.maximum.reduceat(self.entry_savings, starts) if len(starts) else np.zeros(0, np.int32)
+
+    def placement(self, solution):
+        """Returns the C*V bitmap of the videos placed in each cache."""
+        V = self.problem.V
+        placed = np.zeros(self.problem.C * V, dtype=bool)
+        for cache_id, videos in solution.items():
+            if videos:
+                placed[cache_id * V + np.fromiter(videos, dtype=np.int64, count=len(videos))] = True
+        return placed
+
+    def saved_per_request(self, solution):
+        """Returns the time saved for each merged request (per single request)."""
+        if not len(self.segment_starts):
+            return np.zeros(0, dtype=np.int64)
+        hits = self.placement(solution)[self.entry_slots]
+        return np.maximum.reduceat(np.where(hits, self.entry_savings, 0), self.segment_starts)
+
+    def score(self, solution):
+        """Returns the score of a solution, the same as compute_score()."""
+        saved = int(np.dot(self.saved_per_request(solution).astype(np.int64), self.pair_counts))
+        return (saved * 1000) // self.total_requests if self.total_requests > 0 else 0
+
+    def endpoint_breakdown(self, solution):
+        """Returns (total saved time, best achievable saved time) per endpoint, as arrays of E values."""
+        E = self.problem.E
+        saved = np.bincount(self.pair_endpoints, weights=self.saved_per_request(solution) * self.pair_counts,
+                            minlength=E)
+        possible = np.bincount(self.pair_endpoints, weights=self.best_possible * self.pair_counts, minlength=E)
+        return saved.astype(np.int64), possible.astype(np.int64)
+
+    def cache_usage(self, solution):
+        """Returns (used MB, number of videos) per cache, as arrays of C values."""
+        used = np.zeros(self.problem.C, dtype=np.int64)
+        videos = np.zeros(self.problem.C, dtype=np.int64)
+        for cache_id, cache_videos in solution.items():
+            if cache_videos:
+                ids = np.fromiter(cache_videos, dtype=np.int64, count=len(cache_videos))
+                used[cache_id] = self.video_sizes[ids].sum()
+                videos[cache_id] = len(ids)
+        return used, videos
+
+
+def print_breakdown(scorer, solution):
+    """Prints the per-cache utilization and per-endpoint saved latency of a solution."""
+    problem = scorer.problem
+    used, videos = scorer.cache_usage(solution)
+    print(f"  caches: {int((videos > 0).sum())}/{problem.C} used, "
+          f"{100 * used.sum() / (problem.C * problem.X):.1f}% of the total capacity")
+    print("  cache   used MB   fill  videos")
+    for cache_id in range(problem.C):
+        print(f"  {cache_id:5d} {used[cache_id]:9d} {100 * used[cache_id] / problem.X:5.1f}% {videos[cache_id]:7d}")
+
+    saved, possible = scorer.endpoint_breakdown(solution)
+    print("  endpoint  requests  saved ms/request  of best possible")
+    for endpoint_id in range(problem.E):
+        num_requests = scorer.requests_per_endpoint[endpoint_id]
+        if not num_requests:
+            continue
+        share = f"{100 * saved[endpoint_id] / possible[endpoint_id]:5.1f}%" if possible[endpoint_id] else "    -"
+        print(f"  {endpoint_id:8d} {int(num_requests):9d} {saved[endpoint_id] / num_requests:17.1f}  {share:>16}")
+
+
+def main():
+    """Main function to validate and score solution files."""
+    parser = argparse.ArgumentParser(description="Validates and scores HashCode 2017 solution files.")
+    parser.add_argument("input_file", help=".in file (a path, or a name inside dataset/)")
+    parser.add_argument("solutions", nargs="+", help=".out files, or folders whose .out files are all scored")
+    parser.add_argument("--breakdown", action="store_true",
+                        help="print the per-cache utilization and per-endpoint saved latency")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the compiled problem cache")
+    args = parser.parse_args()
+
+    input_path = args.input_file
+    if not os.path.exists(input_path):
+        input_path = os.path.join("dataset", args.input_file)
+    if not os.path.exists(input_path):
+        print(f"Error: {args.input_file} not found")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    problem = load_problem(input_path, use_cache=not args.no_cache)
+    scorer = SolutionScorer(problem)
+    print(f"Loaded {input_path} in {time.perf_counter() - start:.2f}s")
+
+    paths = []
+    for path in args.solutions:
+        paths.extend(sorted(glob.glob(os.path.join(path, "*.out"))) if os.path.isdir(path) else [path])
+
+    invalid = 0
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            solution = load_solution(path, problem.C, problem.X, problem.video_sizes)
+        except (OSError, ValueError) as e:
+            print(f"{path}: invalid: {e}")
+            invalid += 1
+            continue
+        score = scorer.score(solution)
+        print(f"{path}: {score} ({time.perf_counter() - start:.3f}s)")
+        if args.breakdown:
+            print_breakdown(scorer, solution)
+
+    if invalid:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+from collections import defaultdict
+from itertools import repeat
+from operator import add, mul
+
+
+class ScoreEngine:
+    """Keeps the best latency of every (video, endpoint) pair so single moves are scored incrementally."""
+
+    def __init__(self, solution, endpoints, requests):
+        self.solution = solution
+        self.endpoints = endpoints
+
+        # Aggregate request descriptions into (video, endpoint) pairs
+        pair_index = {}
+        self.pair_endpoint = []
+        self.pair_count = []
+        self.video_pairs = defaultdict(list)  # video -> pair ids
+        self.total_requests = 0
+        for video_id, endpoint_id, num_requests in requests:
+            self.total_requests += num_requests
+            key = (video_id, endpoint_id)
+            pair = pair_index.get(key)
+            if pair is None:
+                pair = len(self.pair_endpoint)
+                pair_index[key] = pair
+                self.pair_endpoint.append(endpoint_id)
+                self.pair_count.append(0)
+                self.video_pairs[video_id].append(pair)
+            self.pair_count[pair] += num_requests
+
+        # cache -> {endpoint: latency}, endpoint -> [(latency, cache)] sorted by latency
+        self.cache_endpoints = defaultdict(dict)
+        self.endpoint_links = []
+        for endpoint_id, (data_center_latency, caches) in enumerate(endpoints):
+            for cache_id, latency in caches.items():
+                self.cache_endpoints[cache_id][endpoint_id] = latency
+            self.endpoint_links.append(sorted(
+                (latency, cache_id) for cache_id, latency in caches.items() if latency < data_center_latency))
+
+        # video -> caches holding it
+        self.video_caches = defaultdict(set)
+        for cache_id, videos in solution.items():
+            for video_id in videos:
+                self.video_caches[video_id].add(cache_id)
+
+        # Start from the data center and lower the pairs served by cached videos
+        self.pair_best = [endpoints[endpoint_id][0] for endpoint_id in self.pair_endpoint]
+        for cache_id, videos in solution.items():
+            links = self.cache_endpoints.get(cache_id)
+            if not links:
+                continue
+            for video_id in videos:
+                for pair in self.video_pairs.get(video_id, ()):
+                    latency = links.get(self.pair_endpoint[pair])
+                    if latency is not None and latency < self.pair_best[pair]:
+                        self.pair_best[pair] = latency
+        self.saved = sum((endpoints[endpoint_id][0] - best) * count
+                         for endpoint_id, best, count in zip(self.pair_endpoint, self.pair_best, self.pair_count))
+
+        # Marginal contributions only change when their video is placed or removed somewhere,
+        # so (cache, video) -> (video version, value) entries stay valid until then
+        self.video_version = defaultdict(int)
+        self._gains = {}
+        self._losses = {}
+        # Eviction order of each cache, rebuilt only after the contents of the cache changed
+        # (tracked by cache_stamp); swaps still price evictions with the current losses
+        self.cache_stamp = defaultdict(int)
+        self._evictions = {}
+
+    def _best_latency(self, video_id, endpoint_id, skip_cache=None):
+        """Returns the lowest latency at which an endpoint can currently fetch a video."""
+        best = self.endpoints[endpoint_id][0]
+        for cache_id in self.video_caches.get(video_id, ()):
+            if cache_id != skip_cache:
+                latency = self.cache_endpoints[cache_id].get(endpoint_id)
+                if latency is not None and latency < best:
+                    best = latency
+        return best
+
+    def potential_gains(self):
+        """Returns the gain of every (cache, video) pair with a non-zero gain against an empty solution."""
+        gains = {}
+        num_caches = len(self.solution)
+        num_links = sum(len(links) for links in self.endpoint_links)
+        if num_links * 8 < num_caches * len(self.endpoints):
+            # Sparse connectivity: visit only the existing links
+            for video_id, pairs in self.video_pairs.items():
+                for pair in pairs:
+                    endpoint_id = self.pair_endpoint[pair]
+                    data_center_latency = self.endpoints[endpoint_id][0]
+                    count = self.pair_count[pair]
+                    for latency, cache_id in self.endpoint_links[endpoint_id]:
+                        key = (cache_id, video_id)
+                        gains[key] = gains.get(key, 0) + (data_center_latency - latency) * count
+            return gains
+
+        # Dense connectivity: per-endpoint saving rows let map() do the per-cache sums at C speed
+        saving_rows = []
+        for endpoint_id, (data_center_latency, _) in enumerate(self.endpoints):
+            row = [0] * num_caches
+            for latency, cache_id in self.endpoint_links[endpoint_id]:
+                row[cache_id] = data_center_latency - latency
+            saving_rows.append(row)
+        for video_id, pairs in self.video_pairs.items():
+            totals = None
+            for pair in pairs:
+                weighted = map(mul, saving_rows[self.pair_endpoint[pair]], repeat(self.pair_count[pair]))
+                totals = list(weighted) if totals is None else list(map(add, totals, weighted))
+            for cache_id, gain in enumerate(totals):
+                if gain:
+                    gains[(cache_id, video_id)] = gain
+        return gains
+
+    def candidate_index(self, max_size=None, gains=None):
+        """Lists, for every cache, the videos that fit in it and could save time there, best first."""
+        if gains is None:
+            gains = self.potential_gains()
+        candidates = defaultdict(list)
+        for (cache_id, video_id), gain in gains.items():
+            if max_size is None or self.solution.video_sizes[video_id] <= max_size:
+                candidates[cache_id].append((gain, video_id))
+        return {cache_id: [video_id for _, video_id in sorted(ranked, reverse=True)]
+                for cache_id, ranked in candidates.items()}
+
+    def stray_videos(self, candidates):
+        """Returns, for every cache, the videos it holds that are not among its candidates.
+
+        Such videos save no time where they are (they come from an initial solution), so
+        removing them is free; moves sampled from the candidate lists alone never do it.
+        """
+        strays = {}
+        for cache_id, videos in self.solution.items():
+            stray = videos.difference(candidates.get(cache_id, ()))
+            if stray:
+                strays[cache_id] = stray
+        return strays
+
+    def stray_video(self, strays, cache_id):
+        """Returns one of the stray videos of a cache (see stray_videos), or None if it has none left."""
+        stray = strays.get(cache_id)
+        return next(iter(stray)) if stray else None
+
+    def forget_strays(self, strays, cache_id, videos):
+        """Drops the videos a move took out of a cache from its strays."""
+        stray = strays.get(cache_id)
+        if stray:
+            stray.difference_update(videos)
+            if not stray:
+                del strays[cache_id]
+
+    def score(self, saved=None):
+        """Converts a total saved time into the HashCode score."""
+        if saved is None:
+            saved = self.saved
+        return (saved * 1000) // self.total_requests if self.total_requests > 0 else 0
+
+    def addition_gain(self, cache_id, video_id):
+        """Returns the saved time gained by adding a video to a cache."""
+        cached = self._gains.get((cache_id, video_id))
+        if cached is not None and cached[0] == self.video_version[video_id]:
+            return cached[1]
+        gain = self._addition_gain(cache_id, video_id)
+        self._gains[(cache_id, video_id)] = (self.video_version[video_id], gain)
+        return gain
+
+    def _addition_gain(self, cache_id, video_id):
+        links = self.cache_endpoints.get(cache_id)
+        if not links:
+            return 0
+        gain = 0
+        for pair in self.video_pairs.get(video_id, ()):
+            latency = links.get(self.pair_endpoint[pair])
+            if latency is not None and latency < self.pair_best[pair]:
+                gain += (self.pair_best[pair] - latency) * self.pair_count[pair]
+        return gain
+
+    def removal_loss(self, cache_id, video_id):
+        """Returns the saved time lost by removing a video from a cache."""
+        cached = self._losses.get((cache_id, video_id))
+        if cached is not None and cached[0] == self.video_version[video_id]:
+            return cached[1]
+        loss = self._removal_loss(cache_id, video_id)
+        self._losses[(cache_id, video_id)] = (self.video_version[video_id], loss)
+        return loss
+
+    def _removal_loss(self, cache_id, video_id):
+        links = self.cache_endpoints.get(cache_id)
+        if not links:
+            return 0
+        loss = 0
+        for pair in self.video_pairs.get(video_id, ()):
+            endpoint_id = self.pair_endpoint[pair]
+            if links.get(endpoint_id) == self.pair_best[pair]:
+                fallback = self._best_latency(video_id, endpoint_id, skip_cache=cache_id)
+                loss += (fallback - self.pair_best[pair]) * self.pair_count[pair]
+        return loss
+
+    def add(self, cache_id, video_id):
+        """Adds a video to a cache and updates the affected best latencies."""
+        links = self.cache_endpoints.get(cache_id, {})
+        for pair in self.video_pairs.get(video_id, ()):
+            latency = links.get(self.pair_endpoint[pair])
+            if latency is not None and latency < self.pair_best[pair]:
+                self.saved += (self.pair_best[pair] - latency) * self.pair_count[pair]
+                self.pair_best[pair] = latency
+        self.solution.add(cache_id, video_id)
+        self._placement_changed(cache_id, video_id)
+        self.video_caches[video_id].add(cache_id)
+
+    def remove(self, cache_id, video_id):
+        """Removes a video from a cache and updates the affected best latencies."""
+        self.solution.remove(cache_id, video_id)
+        self._placement_changed(cache_id, video_id)
+        self.video_caches[video_id].discard(cache_id)
+        links = self.cache_endpoints.get(cache_id, {})
+        for pair in self.video_pairs.get(video_id, ()):
+            endpoint_id = self.pair_endpoint[pair]
+            if links.get(endpoint_id) == self.pair_best[pair]:
+                fallback = self._best_latency(video_id, endpoint_id)
+                self.saved -= (fallback - self.pair_best[pair]) * self.pair_count[pair]
+                self.pair_best[pair] = fallback
+
+    def _placement_changed(self, cache_id, video_id):
+        self.video_version[video_id] += 1
+        self.cache_stamp[cache_id] += 1
+
+    def eviction_order(self, cache_id):
+        """Returns the videos of a cache sorted by saved time lost per MB if removed, cheapest first."""
+        cached = self._evictions.get(cache_id)
+        if cached is not None and cached[0] == self.cache_stamp[cache_id]:
+            return cached[1]
+        sizes = self.solution.video_sizes
+        ranked = sorted(self.solution[cache_id], key=lambda v: self.removal_loss(cache_id, v) / sizes[v])
+        self._evictions[cache_id] = (self.cache_stamp[cache_id], ranked)
+        return ranked
+
+    def best_swap(self, cache_id, video_id):
+        """Evaluates inserting a video into a cache that lacks space by evicting the videos that cost
+        the least saved time per MB; returns (delta, evicted videos), or (None, []) if it cannot fit."""
+        solution = self.solution
+        sizes = solution.video_sizes
+        needed = sizes[video_id] - solution.free_space(cache_id)
+        if needed <= 0:
+            return self.addition_gain(cache_id, video_id), []
+        if sizes[video_id] > solution.X:
+            return None, []
+
+        # Videos contribute independently, so the swap delta is the sum of the cached marginals
+        evicted = []
+        delta = self.addition_gain(cache_id, video_id)
+        for victim in self.eviction_order(cache_id):
+            evicted.append(victim)
+            delta -= self.removal_loss(cache_id, victim)
+            needed -= sizes[victim]
+            if needed <= 0:
+                return delta, evicted
+        return None, []
+
+    def swap(self, cache_id, video_id, evicted):
+        """Evicts videos from a cache and inserts another one in their place."""
+        for victim in evicted:
+            self.remove(cache_id, victim)
+        self.add(cache_id, video_id)
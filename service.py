@@ -0,0 +1,377 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from benchmark import SOLVERS
+from hillclimbing import compute_score, save_solution
+from initialization import INIT_METHODS
+from problem import parse_input
+from solvers import OUTPUT_FOLDERS
+
+DEFAULT_PORT = 8765
+DATASET_FOLDER = "dataset"
+PROGRESS_INTERVAL = 1.0  # Seconds between two best-so-far updates of a running job
+MAX_PROBLEMS = 4  # Parsed instances kept by each worker, least recently used dropped first
+
+# Parsed problems and the update queue of the current worker process
+_worker = {}
+
+
+def _init_worker(updates):
+    """Runs once per worker process, which then keeps its parsed problems across jobs."""
+    _worker["updates"] = updates
+    _worker["problems"] = OrderedDict()  # path -> (mtime, problem)
+
+
+def _problem(input_path):
+    """Returns the parsed instance, parsing it only the first time (or after the file changed)."""
+    problems = _worker["problems"]
+    path = os.path.abspath(input_path)
+    mtime = os.path.getmtime(path)
+    cached = problems.get(path)
+    if cached is None or cached[0] != mtime:
+        # A changed file replaces the entry of its previous version
+        problems[path] = (mtime, parse_input(path))
+    problems.move_to_end(path)
+    while len(problems) > MAX_PROBLEMS:
+        problems.popitem(last=False)
+    return problems[path][1]
+
+
+def _run_job(job_id, input_path, solver, init, time_limit, seed, output_path):
+    """Solves one job in a worker and returns (score, parse_time, search_time)."""
+    updates = _worker["updates"]
+    updates.put((job_id, "running", None, None))
+    start = time.perf_counter()
+    problem = _problem(input_path)
+    parse_time = time.perf_counter() - start
+    V, E, R, C, X, video_sizes, endpoints, requests = problem
+
+    last_update = 0.0
+
+    def progress(iteration, score):
+        nonlocal last_update
+        now = time.perf_counter()
+        if now - last_update >= PROGRESS_INTERVAL:
+            last_update = now
+            updates.put((job_id, "progress", iteration, score))
+
+    random.seed(seed)
+    start = time.perf_counter()
+    # Solvers print their own progress, which would interleave between jobs
+    with contextlib.redirect_stdout(io.StringIO()):
+        solution, _ = SOLVERS[solver](problem, init, time_limit, progress)
+    search_time = time.perf_counter() - start
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    save_solution(solution, output_path)
+    return compute_score(solution, video_sizes, endpoints, requests), parse_time, search_time
+
+
+def _is_file_name(value, extension):
+    # A bare name, so clients can only reach files inside the folders the server picks
+    return (isinstance(value, str) and value == os.path.basename(value) and value.endswith(extension)
+            and not value.startswith("."))
+
+
+def resolve_instance(name):
+    """Returns the path of an .in file inside dataset/, or None if there is no such file."""
+    if not _is_file_name(name, ".in"):
+        return None
+    path = os.path.join(DATASET_FOLDER, name)
+    return path if os.path.isfile(path) else None
+
+
+def _is_number(value):
+    # JSON true/false decode to bools, which are ints too
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_job_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class JobServer:
+    """Queues solve jobs and runs them on a bounded process pool, answering JSON-lines requests about them.
+
+    Every request is one JSON object per line with a "command" (submit, status, cancel or
+    shutdown) and the server answers with one JSON object per line. Jobs wait in the server's
+    own queue and only workers jobs are handed to the pool at a time, so a queued job can
+    always be cancelled. Workers keep the problems they parsed, so later jobs on the same
+    instance skip parsing, and report the best score of their running job at most every
+    PROGRESS_INTERVAL seconds.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.jobs = {}
+        self.next_id = 1
+        self.pending = asyncio.Queue()
+        self.updates = multiprocessing.Queue()
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                            initargs=(self.updates,))
+        self.stopped = None
+
+    def submit(self, request):
+        if self.stopped is not None and self.stopped.is_set():
+            return {"error": "the server is shutting down"}
+        instance = request.get("instance")
+        solver = request.get("solver", "hill")
+        init = request.get("init", "density")
+        time_limit = request.get("time_limit")
+        seed = request.get("seed", 0)
+        output = request.get("output")
+        input_path = resolve_instance(instance)
+        if input_path is None:
+            return {"error": f"instance must be the name of an .in file inside {DATASET_FOLDER}/"}
+        if not isinstance(solver, str) or solver not in SOLVERS:
+            return {"error": f"unknown solver {solver}, expected one of {', '.join(sorted(SOLVERS))}"}
+        if not isinstance(init, str) or init not in INIT_METHODS:
+            return {"error": f"unknown init {init}, expected one of {', '.join(INIT_METHODS)}"}
+        if not _is_number(time_limit) or time_limit <= 0:
+            return {"error": "time_limit must be a positive number of seconds"}
+        if not _is_job_id(seed):
+            return {"error": "seed must be an integer"}
+        if output is not None and not _is_file_name(output, ".out"):
+            return {"error": f"output must be the name of an .out file, saved inside {OUTPUT_FOLDERS[solver]}/"}
+
+        job_id = self.next_id
+        self.next_id += 1
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        output_path = os.path.join(OUTPUT_FOLDERS[solver], output or f"{stem}.job{job_id}.out")
+        self.jobs[job_id] = {
+            "id": job_id, "instance": input_path, "solver": solver, "init": init, "time_limit": time_limit,
+            "seed": seed, "output": output_path, "state": "queued", "submitted": time.time(), "started": None,
+            "finished": None, "iteration": None, "best": None, "score": None, "parse_time": None, "error": None,
+        }
+        self.pending.put_nowait(job_id)
+        return {"job": job_id}
+
+    async def run_jobs(self):
+        """Hands queued jobs to the pool one at a time; the server runs one of these per worker."""
+        loop = asyncio.get_running_loop()
+        while (job_id := await self.pending.get()) is not None:
+            job = self.jobs[job_id]
+            if job["state"] != "queued":
+                continue  # Cancelled while it waited
+            job["state"] = "starting"
+            try:
+                future = self.executor.submit(_run_job, job_id, job["instance"], job["solver"], job["init"],
+                                              job["time_limit"], job["seed"], job["output"])
+                score, parse_time, _ = await asyncio.wrap_future(future, loop=loop)
+            except Exception as e:
+                # Clients only get the exception type: its message may quote the files the worker read
+                print(f"Job {job_id} failed: {e!r}", flush=True)
+                job["state"], job["error"] = "failed", type(e).__name__
+            else:
+                job["state"], job["score"], job["best"], job["parse_time"] = "done", score, score, parse_time
+            job["finished"] = time.time()
+
+    def _update(self, job_id, kind, iteration, score):
+        job = self.jobs.get(job_id)
+        if job is None or job["state"] not in ("starting", "running"):
+            return
+        if kind == "running":
+            job["state"], job["started"] = "running", time.time()
+        else:
+            job["iteration"], job["best"] = iteration, score
+
+    async def watch_updates(self):
+        """Applies the updates that workers send through the queue."""
+        loop = asyncio.get_running_loop()
+        while True:
+            update = await loop.run_in_executor(None, self.updates.get)
+            if update is None:
+                return
+            self._update(*update)
+
+    def status(self, request):
+        now = time.time()
+        job_id = request.get("job")
+        if job_id is not None and not _is_job_id(job_id):
+            return {"error": "job must be an integer"}
+        jobs = []
+        for job_id in [job_id] if job_id is not None else sorted(self.jobs):
+            job = self.jobs.get(job_id)
+            if job is None:
+                return {"error": f"no job {job_id}"}
+            elapsed = None
+            if job["started"] is not None:
+                elapsed = round((job["finished"] or now) - job["started"], 1)
+            jobs.append(dict(job, elapsed=elapsed))
+        return {"jobs": jobs}
+
+    def cancel(self, request):
+        """Cancels a job that has not started yet; running jobs finish within their time budget."""
+        job_id = request.get("job")
+        if not _is_job_id(job_id):
+            return {"error": "job must be an integer"}
+        job = self.jobs.get(job_id)
+        if job is None or job["state"] != "queued":
+            return {"error": f"job {job_id} is not queued"}
+        job["state"], job["finished"] = "cancelled", time.time()
+        return {"cancelled": job_id}
+
+    async def handle(self, reader, writer):
+        """Answers the requests of one client connection."""
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("a request is a JSON object")
+                    command = request.get("command")
+                    if command == "submit":
+                        response = self.submit(request)
+                    elif command == "status":
+                        response = self.status(request)
+                    elif command == "cancel":
+                        response = self.cancel(request)
+                    elif command == "shutdown":
+                        self.stopped.set()
+                        response = {"shutdown": True}
+                    else:
+                        response = {"error": f"unknown command {command}"}
+                except ValueError as e:
+                    response = {"error": f"bad request: {e}"}
+                except Exception as e:  # A failing command must not drop the connection
+                    response = {"error": repr(e)}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT, socket_path=None):
+        """Serves until a shutdown request, then cancels the queued jobs and waits for the running ones."""
+        self.stopped = asyncio.Event()
+        if socket_path is not None:
+            server = await asyncio.start_unix_server(self.handle, path=socket_path)
+            print(f"Listening on {socket_path}", flush=True)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            print(f"Listening on {host}:{port}", flush=True)
+        watcher = asyncio.create_task(self.watch_updates())
+        runners = [asyncio.create_task(self.run_jobs()) for _ in range(self.workers)]
+        async with server:
+            await self.stopped.wait()
+
+        for job in self.jobs.values():
+            if job["state"] == "queued":
+                job["state"], job["finished"] = "cancelled", time.time()
+        for _ in runners:
+            self.pending.put_nowait(None)
+        await asyncio.gather(*runners)
+        await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+        self.updates.put(None)
+        await watcher
+        if socket_path is not None:
+            os.remove(socket_path)
+
+
+async def request(message, host="127.0.0.1", port=DEFAULT_PORT, socket_path=None):
+    """Sends one request to a running server and returns its answer."""
+    if socket_path is not None:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    writer.close()
+    await writer.wait_closed()
+    return response
+
+
+def print_jobs(jobs):
+    """Prints one line per job."""
+    print(f"{'job':>4} {'state':<9} {'solver':<6} {'seed':>5} {'elapsed':>8} {'best':>9}  instance")
+    for job in jobs:
+        elapsed = f"{job['elapsed']:.1f}s" if job["elapsed"] is not None else "-"
+        best = job["best"] if job["best"] is not None else "-"
+        line = (f"{job['id']:>4} {job['state']:<9} {job['solver']:<6} {job['seed']:>5} {elapsed:>8} {best:>9}  "
+                f"{job['instance']}")
+        if job["state"] == "done":
+            line += f" -> {job['output']}"
+        elif job["error"]:
+            line += f" ({job['error']})"
+        print(line)
+
+
+def main():
+    """Main function to run the job server or talk to it."""
+    parser = argparse.ArgumentParser(description="Local job queue for batch optimization runs.")
+    parser.add_argument("--host", default="127.0.0.1", help="server address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"server port (default: {DEFAULT_PORT})")
+    parser.add_argument("--socket", help="Unix socket path, used instead of --host/--port")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the server")
+    serve.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+
+    submit = commands.add_parser("submit", help="queue solve jobs")
+    submit.add_argument("instance", help="name of the .in file inside dataset/")
+    submit.add_argument("--solver", choices=sorted(SOLVERS), default="hill")
+    submit.add_argument("--init", choices=INIT_METHODS, default="density",
+                        help="initial solution of the local searches (default: density)")
+    submit.add_argument("--time-limit", type=float, default=60.0, help="seconds per job (default: 60)")
+    submit.add_argument("--seeds", type=int, nargs="+", default=[0], help="one job per seed (default: 0)")
+    submit.add_argument("--output", help="name of the solution file inside output_<solver>/ "
+                                         "(default: <instance>.job<id>.out)")
+
+    status = commands.add_parser("status", help="show the jobs and their best scores so far")
+    status.add_argument("job", type=int, nargs="?")
+
+    cancel = commands.add_parser("cancel", help="cancel a queued job")
+    cancel.add_argument("job", type=int)
+
+    commands.add_parser("shutdown", help="stop the server once the running jobs finish")
+    args = parser.parse_args()
+    address = {"host": args.host, "port": args.port, "socket_path": args.socket}
+
+    if args.command == "serve":
+        asyncio.run(JobServer(args.workers).serve(**address))
+        return
+
+    if args.command == "submit":
+        if args.output and len(args.seeds) > 1:
+            parser.error("--output needs a single seed")
+        messages = [{"command": "submit", "instance": args.instance, "solver": args.solver, "init": args.init,
+                     "time_limit": args.time_limit, "seed": seed, "output": args.output} for seed in args.seeds]
+    elif args.command in ("status", "cancel"):
+        messages = [{"command": args.command, "job": args.job}]
+    else:
+        messages = [{"command": args.command}]
+
+    try:
+        responses = [asyncio.run(request(message, **address)) for message in messages]
+    except OSError as e:
+        print(f"Error: cannot reach the server: {e}")
+        sys.exit(1)
+
+    failed = False
+    for response in responses:
+        if "error" in response:
+            print(f"Error: {response['error']}")
+            failed = True
+        elif "jobs" in response:
+            print_jobs(response["jobs"])
+        elif "job" in response:
+            print(f"Queued job {response['job']}")
+        elif "cancelled" in response:
+            print(f"Cancelled job {response['cancelled']}")
+        else:
+            print("Server shutting down")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
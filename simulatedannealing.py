@@ -0,0 +1,230 @@
+import argparse
+import math
+import os
+import random
+import time
+from itertools import count
+from hillclimbing import compute_score, save_solution
+from initialization import INIT_METHODS, build_solution
+from problem import parse_input
+from scoring import ScoreEngine
+from solution import load_solution
+import telemetry
+
+COOLING_SCHEDULES = ("geometric", "adaptive")
+MIN_TEMPERATURE = 1e-9  # Cooling never goes below it, so acceptance never divides by zero
+
+
+def _propose(engine, candidates, candidate_caches, cache_videos, strays, run_telemetry=None):
+    """Samples one move and returns (cache_id, video_id, evicted, delta), evicted being None for removals."""
+    cache_id = random.choice(candidate_caches)
+    ranked = candidates.get(cache_id, ())
+    stray_id = engine.stray_video(strays, cache_id)
+    if stray_id is not None and (not ranked or random.random() < 0.5):
+        video_id = stray_id  # Half of the moves in a cache holding strays remove one
+    elif not ranked:
+        return None  # A cache without candidates whose strays are all gone
+    else:
+        # Squaring the uniform draw favours the front of the ranked list
+        video_id = ranked[int(len(ranked) * random.random() ** 2)]
+    if run_telemetry is not None:
+        run_telemetry.lap("moves")
+    if video_id in cache_videos[cache_id]:
+        return cache_id, video_id, None, -engine.removal_loss(cache_id, video_id)
+    delta, evicted = engine.best_swap(cache_id, video_id)
+    if delta is None:
+        return None
+    return cache_id, video_id, evicted, delta
+
+
+def calibrate_temperature(engine, candidates, candidate_caches, cache_videos, strays, acceptance=0.05, samples=1000):
+    """Returns the temperature at which sampled worsening moves are accepted with the given average rate."""
+    losses = []
+    for _ in range(samples):
+        move = _propose(engine, candidates, candidate_caches, cache_videos, strays)
+        if move is not None and move[3] < 0:
+            losses.append(-move[3])
+    if not losses:
+        return 1.0
+
+    # The acceptance rate grows with the temperature, so bisect on a log scale
+    low, high = 1e-9, float(max(losses))
+    for _ in range(60):
+        temperature = math.sqrt(low * high)
+        rate = sum(math.exp(-loss / temperature) for loss in losses) / len(losses)
+        if rate < acceptance:
+            low = temperature
+        else:
+            high = temperature
+    return high
+
+
+def simulated_annealing(cache_videos, V, C, X, video_sizes, endpoints, requests, max_iters=1000000, time_limit=None,
+                        cooling="geometric", initial_temperature=None, initial_acceptance=0.02, alpha=0.95,
+                        steps_per_temperature=10000, target_acceptance=0.02, reheat_after=200000, reheat_ratio=0.5,
+                        progress=None, run_telemetry=None):
+    """Performs simulated annealing to optimize cache allocation."""
+    if cooling not in COOLING_SCHEDULES:
+        raise ValueError(f"Unknown cooling schedule: {cooling}")
+    if max_iters is None and time_limit is None:
+        raise ValueError("simulated_annealing needs max_iters or time_limit")
+
+    engine = ScoreEngine(cache_videos, endpoints, requests)
+    candidates = engine.candidate_index(max_size=X)
+    strays = engine.stray_videos(candidates)
+    candidate_caches = [cache_id for cache_id in range(C) if candidates.get(cache_id) or cache_id in strays]
+    if not candidate_caches:
+        return cache_videos
+
+    if initial_temperature is None:
+        initial_temperature = calibrate_temperature(engine, candidates, candidate_caches, cache_videos, strays,
+                                                    acceptance=initial_acceptance)
+    temperature = max(initial_temperature, MIN_TEMPERATURE)
+
+    best_saved = engine.saved
+    best_solution = None  # None while the current solution is the best one
+    since_best = 0
+    tried_worse = accepted_worse = 0
+
+    start = time.perf_counter()
+    deadline = None if time_limit is None else start + time_limit
+
+    iteration = 0
+    tried = accepted = infeasible = 0
+    if run_telemetry is not None:
+        run_telemetry.lap("setup")
+    for iteration in (range(max_iters) if max_iters is not None else count()):
+        if run_telemetry is not None:
+            run_telemetry.lap("scoring")
+            if iteration % 256 == 0:
+                run_telemetry.update(iteration, engine.score(), engine.score(best_saved), tried=tried,
+                                     accepted=accepted, rejected=tried - accepted - infeasible,
+                                     infeasible=infeasible, temperature=temperature)
+        if iteration % steps_per_temperature == 0 and iteration:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if cooling == "geometric":
+                temperature = max(temperature * alpha, MIN_TEMPERATURE)
+            else:
+                elapsed = iteration / max_iters if max_iters is not None else 0.0
+                if deadline is not None:
+                    elapsed = max(elapsed, (time.perf_counter() - start) / time_limit)
+                rate = accepted_worse / tried_worse if tried_worse else 0.0
+                temperature = temperature * alpha if rate > target_acceptance * (1 - elapsed) else temperature / alpha
+                temperature = max(temperature, MIN_TEMPERATURE)
+            tried_worse = accepted_worse = 0
+        elif deadline is not None and iteration % 256 == 0 and time.perf_counter() >= deadline:
+            break
+
+        move = _propose(engine, candidates, candidate_caches, cache_videos, strays, run_telemetry)
+        tried += 1
+        if move is None:
+            infeasible += 1
+            continue
+        cache_id, video_id, evicted, delta = move
+
+        if delta < 0:
+            tried_worse += 1
+            if random.random() >= math.exp(delta / temperature):
+                continue
+            accepted_worse += 1
+            if best_solution is None:
+                # Leaving the best solution: snapshot it (copy-on-write)
+                best_solution = cache_videos.copy()
+
+        if evicted is None:
+            engine.remove(cache_id, video_id)
+        else:
+            engine.swap(cache_id, video_id, evicted)
+        engine.forget_strays(strays, cache_id, evicted or [video_id])
+        accepted += 1
+
+        since_best += 1
+        if engine.saved > best_saved:
+            best_saved = engine.saved
+            best_solution = None
+            since_best = 0
+            if progress is not None:
+                progress(iteration, engine.score(best_saved))
+        elif reheat_after and since_best >= reheat_after:
+            temperature = max(temperature, initial_temperature * reheat_ratio)
+            since_best = 0
+
+    if run_telemetry is not None:
+        run_telemetry.update(iteration, engine.score(), engine.score(best_saved), tried=tried, accepted=accepted,
+                             rejected=tried - accepted - infeasible, infeasible=infeasible, temperature=temperature)
+    if progress is not None:
+        progress(iteration, engine.score(best_saved))
+    return cache_videos if best_solution is None else best_solution
+
+
+def main():
+    """Main function to execute the simulated annealing algorithm."""
+    parser = argparse.ArgumentParser(description="Optimizes a HashCode 2017 instance from dataset/ with simulated annealing.")
+    parser.add_argument("input_file", help="name of the .in file inside dataset/")
+    parser.add_argument("--init", choices=INIT_METHODS, default="density",
+                        help="initial solution builder (default: density)")
+    parser.add_argument("--init-from", metavar="FILE",
+                        help="start from an existing .out solution instead of building one")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the compiled problem cache")
+    parser.add_argument("--max-iters", type=int, default=1000000, help="moves to try (default: 1000000)")
+    parser.add_argument("--time-limit", type=float, help="seconds to run, replaces --max-iters")
+    parser.add_argument("--cooling", choices=COOLING_SCHEDULES, default="geometric",
+                        help="geometric: multiply by --alpha every --steps moves; adaptive: follow --target-acceptance")
+    parser.add_argument("--t0", type=float, help="initial temperature (default: calibrated from sampled moves)")
+    parser.add_argument("--initial-acceptance", type=float, default=0.02,
+                        help="acceptance rate of worsening moves used to calibrate the initial temperature")
+    parser.add_argument("--alpha", type=float, default=0.95, help="cooling factor per temperature step")
+    parser.add_argument("--steps", type=int, default=10000, help="moves per temperature step")
+    parser.add_argument("--target-acceptance", type=float, default=0.02,
+                        help="initial acceptance rate of worsening moves for adaptive cooling")
+    parser.add_argument("--reheat-after", type=int, default=200000,
+                        help="moves without a new best before reheating (0 disables reheating)")
+    parser.add_argument("--seed", type=int, help="random seed")
+    telemetry.add_arguments(parser)
+    args = parser.parse_args()
+
+    input_filename = args.input_file
+    input_path = os.path.join("dataset", input_filename)
+    output_folder = "output_sa"
+    os.makedirs(output_folder, exist_ok=True)
+
+    if not os.path.exists(input_path):
+        print(f"Error: {input_filename} not found in dataset/")
+        return
+
+    output_path = os.path.join(output_folder, input_filename.replace(".in", ".out"))
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    run_telemetry = telemetry.from_args(args, "sa")
+    with telemetry.timed(run_telemetry, "io"):
+        V, E, R, C, X, video_sizes, endpoints, requests = parse_input(input_path, use_cache=not args.no_cache)
+    with telemetry.timed(run_telemetry, "init"):
+        if args.init_from:
+            try:
+                cache_videos = load_solution(args.init_from, C, X, video_sizes)
+            except (OSError, ValueError) as e:
+                print(f"Error: cannot start from {args.init_from}: {e}")
+                return
+        else:
+            cache_videos = build_solution(args.init, V, C, X, video_sizes, endpoints, requests)
+    max_iters = None if args.time_limit is not None else args.max_iters
+    optimized_cache_videos = simulated_annealing(
+        cache_videos, V, C, X, video_sizes, endpoints, requests, max_iters=max_iters, time_limit=args.time_limit,
+        cooling=args.cooling, initial_temperature=args.t0, initial_acceptance=args.initial_acceptance,
+        alpha=args.alpha, steps_per_temperature=args.steps,
+        target_acceptance=args.target_acceptance, reheat_after=args.reheat_after, run_telemetry=run_telemetry)
+    with telemetry.timed(run_telemetry, "io"):
+        save_solution(optimized_cache_videos, output_path)
+    if run_telemetry is not None:
+        run_telemetry.close()
+
+    print(f"Processed {input_filename}, output saved to {output_path}")
+
+    final_score = compute_score(optimized_cache_videos, video_sizes, endpoints, requests)
+    print(f"Final score: {final_score}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+class Solution:
+    """Videos stored in each cache, with the used space of every cache kept up to date.
+
+    Copies are copy-on-write: a copy shares the per-cache sets with the original and a cache
+    is only duplicated the first time either side modifies it, so snapshotting costs O(C)
+    references plus O(size) for each cache that changes afterwards.
+    """
+
+    def __init__(self, C, X, video_sizes):
+        self.X = X
+        self.video_sizes = video_sizes
+        self.cache_videos = {i: set() for i in range(C)}
+        self.used = [0] * C
+        self.shared = set()  # caches whose set may also belong to another Solution
+
+    def __getitem__(self, cache_id):
+        return self.cache_videos[cache_id]
+
+    def __contains__(self, cache_id):
+        return cache_id in self.cache_videos
+
+    def __iter__(self):
+        return iter(self.cache_videos)
+
+    def __len__(self):
+        return len(self.cache_videos)
+
+    def items(self):
+        return self.cache_videos.items()
+
+    def fits(self, cache_id, video_id):
+        """Checks in O(1) whether a video fits in the free space of a cache."""
+        return self.used[cache_id] + self.video_sizes[video_id] <= self.X
+
+    def free_space(self, cache_id):
+        return self.X - self.used[cache_id]
+
+    def _own(self, cache_id):
+        """Gives this solution a private copy of a cache set before it is modified."""
+        if cache_id in self.shared:
+            self.cache_videos[cache_id] = self.cache_videos[cache_id].copy()
+            self.shared.discard(cache_id)
+
+    def add(self, cache_id, video_id):
+        self._own(cache_id)
+        self.cache_videos[cache_id].add(video_id)
+        self.used[cache_id] += self.video_sizes[video_id]
+
+    def remove(self, cache_id, video_id):
+        self._own(cache_id)
+        self.cache_videos[cache_id].remove(video_id)
+        self.used[cache_id] -= self.video_sizes[video_id]
+
+    def assign(self, cache_id, videos, used=None):
+        """Replaces the contents of a cache, reusing a known used size when given."""
+        self.cache_videos[cache_id] = videos
+        self.used[cache_id] = used if used is not None else sum(self.video_sizes[v] for v in videos)
+        self.shared.discard(cache_id)
+
+    def copy(self):
+        """Returns a copy-on-write snapshot of the solution."""
+        clone = Solution.__new__(Solution)
+        clone.X = self.X
+        clone.video_sizes = self.video_sizes
+        clone.cache_videos = self.cache_videos.copy()
+        clone.used = self.used.copy()
+        self.shared = set(self.cache_videos)
+        clone.shared = set(self.cache_videos)
+        return clone
+
+
+def load_solution(file_path, C, X, video_sizes):
+    """Reads a solution file in the HashCode output format into a Solution, validating it against the instance.
+
+    Raises ValueError naming the file and line when a line is malformed, a cache or video id is
+    out of range, a cache is described twice, a video is repeated in a cache, a cache exceeds its
+    capacity, or there are more cache descriptions than the first line announces.
+    """
+    solution = Solution(C, X, video_sizes)
+    V = len(video_sizes)
+    with open(file_path, 'r') as f:
+        lines = f.read().splitlines()
+
+    def error(line_number, message):
+        return ValueError(f"{file_path}:{line_number}: {message}")
+
+    if not lines or not lines[0].strip().isdigit():
+        raise error(1, "expected the number of cache descriptions")
+    declared = int(lines[0])
+    described = set()
+    for line_number, line in enumerate(lines[1:], start=2):
+        try:
+            values = list(map(int, line.split()))
+        except ValueError:
+            raise error(line_number, "expected integers") from None
+        if not values:
+            continue
+        cache_id, videos = values[0], values[1:]
+        if not 0 <= cache_id < C:
+            raise error(line_number, f"cache id {cache_id} is not in [0, {C})")
+        if cache_id in described:
+            raise error(line_number, f"cache {cache_id} is described twice")
+        for video_id in videos:
+            if not 0 <= video_id < V:
+                raise error(line_number, f"video id {video_id} is not in [0, {V})")
+        video_set = set(videos)
+        if len(video_set) != len(videos):
+            raise error(line_number, f"cache {cache_id} lists a video more than once")
+        used = sum(video_sizes[v] for v in video_set)
+        if used > X:
+            raise error(line_number, f"cache {cache_id} holds {used} MB, more than its capacity of {X} MB")
+        solution.assign(cache_id, video_set, used)
+        described.add(cache_id)
+    if len(described) > declared:
+        raise error(1, f"{len(described)} cache descriptions but the first line announces {declared}")
+    return solution
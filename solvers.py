@@ -0,0 +1,17 @@
+from hillclimbing import hill_climb
+from simulatedannealing import simulated_annealing
+from tabusearch import tabu_search
+
+# The local searches, all called as search(cache_videos, V, C, X, video_sizes, endpoints, requests,
+# max_iters=..., time_limit=..., progress=...), and the folder each one saves its solutions to.
+# New local searches only need an entry here to show up in multistart.py, reduction.py,
+# benchmark.py and service.py.
+SOLVERS = {
+    "hill": (hill_climb, "output_hill"),
+    "tabu": (tabu_search, "output_tabu"),
+    "sa": (simulated_annealing, "output_sa"),
+}
+
+# Output folders of every solver, the GA of "Genetic Algorithm/" included
+OUTPUT_FOLDERS = {name: output_folder for name, (_, output_folder) in SOLVERS.items()}
+OUTPUT_FOLDERS["ga"] = "output_ga"
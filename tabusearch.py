@@ -1,51 +1,14 @@
+import argparse
 import os
-import sys
 import random
-from collections import deque
-
-def parse_input(file_path):
-    """Parses the input file and returns problem data."""
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
-    
-    V, E, R, C, X = map(int, lines[0].split())  # Videos, Endpoints, Requests, Caches, Cache Size
-    video_sizes = list(map(int, lines[1].split()))
-    
-    endpoints = []
-    line_idx = 2
-    for _ in range(E):
-        data_center_latency, num_cache_connections = map(int, lines[line_idx].split())
-        line_idx += 1
-        caches = {}
-        for _ in range(num_cache_connections):
-            cache_id, latency = map(int, lines[line_idx].split())
-            caches[cache_id] = latency
-            line_idx += 1
-        endpoints.append((data_center_latency, caches))
-    
-    requests = []
-    for _ in range(R):
-        video_id, endpoint_id, num_requests = map(int, lines[line_idx].split())
-        requests.append((video_id, endpoint_id, num_requests))
-        line_idx += 1
-    
-    return V, E, R, C, X, video_sizes, endpoints, requests
-
-def initialize_solution(V, C, X, video_sizes, requests):
-    """Generates an initial greedy solution."""
-    cache_videos = {i: set() for i in range(C)}
-    video_popularity = {v: 0 for v in range(V)}
-    for video_id, _, num_requests in requests:
-        video_popularity[video_id] += num_requests
-    
-    sorted_videos = sorted(video_popularity, key=lambda v: -video_popularity[v])
-    
-    for video in sorted_videos:
-        for cache in range(C):
-            if sum(video_sizes[v] for v in cache_videos[cache]) + video_sizes[video] <= X:
-                cache_videos[cache].add(video)
-    
-    return cache_videos
+import time
+from itertools import count
+from initialization import INIT_METHODS, build_solution
+from problem import parse_input
+from scoring import ScoreEngine
+from solution import load_solution
+import checkpoint
+import telemetry
 
 def compute_score(cache_videos, video_sizes, endpoints, requests):
     """Computes the total score of the current solution."""
@@ -66,33 +29,189 @@ def compute_score(cache_videos, video_sizes, endpoints, requests):
     
     return (total_saved_time * 1000) // total_requests if total_requests > 0 else 0
 
-def tabu_search(cache_videos, V, C, X, video_sizes, endpoints, requests, max_iters=10000, tabu_size=100):
+class TabuMemory:
+    """Short-term and long-term memory of the (cache, video) pairs touched by accepted moves.
+
+    expiry maps a pair to the first iteration at which moving it again is allowed, so checking
+    a move is one dict lookup whatever the tenure; frequency counts how often each pair moved.
+    """
+
+    def __init__(self, tenure):
+        self.tenure = tenure
+        self.expiry = {}
+        self.frequency = {}
+
+    def is_tabu(self, cache_id, video_id, iteration):
+        return self.expiry.get((cache_id, video_id), 0) > iteration
+
+    def forbid(self, cache_id, video_id, iteration):
+        """Records a move of the pair and forbids undoing it for the next tenure iterations."""
+        key = (cache_id, video_id)
+        self.expiry[key] = iteration + 1 + self.tenure
+        self.frequency[key] = self.frequency.get(key, 0) + 1
+
+    def moves(self, cache_id, video_id):
+        return self.frequency.get((cache_id, video_id), 0)
+
+    def state(self):
+        return {"expiry": dict(self.expiry), "frequency": dict(self.frequency)}
+
+    def restore(self, state):
+        self.expiry = dict(state["expiry"])
+        self.frequency = dict(state["frequency"])
+
+
+def _return_to(engine, cache_videos, target):
+    """Moves the engine's solution back to target, applying only the differences."""
+    for cache_id, videos in cache_videos.items():
+        if videos is not target[cache_id]:
+            for video_id in videos - target[cache_id]:
+                engine.remove(cache_id, video_id)
+    for cache_id, videos in target.items():
+        if videos is not cache_videos[cache_id]:
+            for video_id in videos - cache_videos[cache_id]:
+                engine.add(cache_id, video_id)
+
+
+def tabu_search(cache_videos, V, C, X, video_sizes, endpoints, requests, max_iters=10000, tabu_size=100,
+                time_limit=None, batch_size=20, stall_limit=1000, diversify_length=100, progress=None,
+                run_telemetry=None, checkpointer=None, resume=None):
     """Performs tabu search to optimize cache allocation."""
-    tabu_list = deque(maxlen=tabu_size)
+    engine = ScoreEngine(cache_videos, endpoints, requests)
+    candidates = engine.candidate_index(max_size=X)
+    strays = engine.stray_videos(candidates)  # Videos saving nothing where they are, removed first
+    candidate_caches = [cache_id for cache_id in range(C) if candidates.get(cache_id) or cache_id in strays]
+    if not candidate_caches:
+        return cache_videos
+    
+    memory = TabuMemory(tabu_size)
     best_solution = cache_videos.copy()
-    best_score = compute_score(cache_videos, video_sizes, endpoints, requests)
+    best_saved = engine.saved
     
-    for _ in range(max_iters):
-        cache_id = random.randint(0, C - 1)
-        video_id = random.randint(0, V - 1)
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    
+    start = 0
+    last_improvement = 0
+    diversify_until = None  # End of the current diversification phase
+    if resume is not None:
+        start = resume["iteration"]
+        random.setstate(resume["rng"])
+        best_solution = checkpoint.unpack_solution(resume["best"], C, X, video_sizes)
+        best_saved = resume["best_saved"]
+        last_improvement = start
+        # Older checkpoints hold a plain tabu list instead, which is dropped
+        if "memory" in resume:
+            memory.restore(resume["memory"])
+            last_improvement, diversify_until = resume["last_improvement"], resume["diversify_until"]
+    
+    def state(next_iteration):
+        # Solutions are copy-on-write snapshots, the checkpointer writes them in the background
+        return {"iteration": next_iteration, "rng": random.getstate(), "memory": memory.state(),
+                "solution": cache_videos.copy(), "best": best_solution, "best_saved": best_saved,
+                "last_improvement": last_improvement, "diversify_until": diversify_until}
+    
+    iteration = start
+    next_iteration = start  # First iteration not run yet, where a resumed run goes on
+    tried = accepted = tabu_skipped = infeasible = diversifications = 0
+    if run_telemetry is not None:
+        run_telemetry.lap("setup")
+    for iteration in (range(start, max_iters) if max_iters is not None else count(start)):
+        if iteration % 256 == 0:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if checkpointer is not None and checkpointer.due():
+                checkpointer.save(state(iteration))
+            if run_telemetry is not None:
+                run_telemetry.update(iteration, engine.score(), engine.score(best_saved), tried=tried, accepted=accepted,
+                                     tabu_skipped=tabu_skipped, infeasible=infeasible, diversifications=diversifications)
+        next_iteration = iteration + 1
         
-        if (cache_id, video_id) in tabu_list:
-            continue  # Skip moves in the tabu list
+        if diversify_until is not None and iteration >= diversify_until:
+            # Intensification: the phase found nothing better, go on from the best solution
+            diversify_until = None
+            last_improvement = iteration
+            if engine.saved < best_saved:
+                _return_to(engine, cache_videos, best_solution)
+                strays = engine.stray_videos(candidates)
+        elif diversify_until is None and stall_limit and iteration - last_improvement >= stall_limit:
+            diversify_until = iteration + diversify_length
+            diversifications += 1
+        diversifying = diversify_until is not None
         
-        if video_id in cache_videos[cache_id]:
-            cache_videos[cache_id].remove(video_id)
-        else:
-            if sum(video_sizes[v] for v in cache_videos[cache_id]) + video_sizes[video_id] <= X:
-                cache_videos[cache_id].add(video_id)
+        cache_id = random.choice(candidate_caches)
+        ranked = candidates.get(cache_id, ())
+        stray_id = engine.stray_video(strays, cache_id)
         
-        new_score = compute_score(cache_videos, video_sizes, endpoints, requests)
+        best_move = None
+        best_rank = None
+        for draw in range(min(batch_size, len(ranked)) + (stray_id is not None)):
+            if run_telemetry is not None:
+                run_telemetry.lap("scoring")
+            if draw == 0 and stray_id is not None:
+                video_id = stray_id
+            elif diversifying:
+                video_id = ranked[int(len(ranked) * random.random())]
+            else:
+                # Squaring the uniform draw favours the front of the ranked list
+                video_id = ranked[int(len(ranked) * random.random() ** 2)]
+            if run_telemetry is not None:
+                run_telemetry.lap("moves")
+            tried += 1
+            if video_id in cache_videos[cache_id]:
+                delta, evicted = -engine.removal_loss(cache_id, video_id), None
+            else:
+                # Adding into a full cache becomes a swap with the cheapest videos in it
+                delta, evicted = engine.best_swap(cache_id, video_id)
+                if delta is None:
+                    infeasible += 1
+                    continue
+            
+            touched = [video_id] + (evicted or [])
+            if any(memory.is_tabu(cache_id, v, iteration) for v in touched) and engine.saved + delta <= best_saved:
+                tabu_skipped += 1
+                continue  # Tabu, and not good enough for aspiration
+            if diversifying:
+                # Least moved pairs first, the best delta among them
+                rank = (-sum(memory.moves(cache_id, v) for v in touched), delta)
+            else:
+                rank = delta
+            if best_rank is None or rank > best_rank:
+                best_move, best_rank = (video_id, evicted), rank
         
-        if new_score > best_score:
-            best_score = new_score
-            best_solution = cache_videos.copy()
+        if run_telemetry is not None:
+            run_telemetry.lap("scoring")
+        if best_move is None:
+            continue
+        
+        video_id, evicted = best_move
+        if evicted is None:
+            engine.remove(cache_id, video_id)
         else:
-            tabu_list.append((cache_id, video_id))  # Mark as tabu if it worsens
+            engine.swap(cache_id, video_id, evicted)
+        engine.forget_strays(strays, cache_id, evicted or [video_id])
+        # Forbid undoing the move for a while
+        memory.forbid(cache_id, video_id, iteration)
+        for victim in evicted or ():
+            memory.forbid(cache_id, victim, iteration)
+        accepted += 1
+        if run_telemetry is not None:
+            run_telemetry.lap("scoring")
+        
+        if engine.saved > best_saved:
+            best_saved = engine.saved
+            best_solution = cache_videos.copy()
+            last_improvement = iteration
+            diversify_until = None
+            if progress is not None:
+                progress(iteration, engine.score(best_saved))
     
+    if run_telemetry is not None:
+        run_telemetry.update(iteration, engine.score(), engine.score(best_saved), tried=tried, accepted=accepted,
+                             tabu_skipped=tabu_skipped, infeasible=infeasible, diversifications=diversifications)
+    if checkpointer is not None:
+        checkpointer.close(state(next_iteration))
+    if progress is not None:
+        progress(iteration, engine.score(best_saved))
     return best_solution
 
 def save_solution(cache_videos, output_file):
@@ -105,11 +224,26 @@ def save_solution(cache_videos, output_file):
 
 def main():
     """Main function to execute the tabu search algorithm."""
-    if len(sys.argv) < 2:
-        print("Usage: python3 tabusearch.py <input_file>")
-        return
+    parser = argparse.ArgumentParser(description="Optimizes a HashCode 2017 instance from dataset/ with tabu search.")
+    parser.add_argument("input_file", help="name of the .in file inside dataset/")
+    parser.add_argument("--init", choices=INIT_METHODS, default="density",
+                        help="initial solution builder (default: density)")
+    parser.add_argument("--init-from", metavar="FILE",
+                        help="start from an existing .out solution instead of building one")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the compiled problem cache")
+    parser.add_argument("--max-iters", type=int, default=10000, help="iterations to run (default: 10000)")
+    parser.add_argument("--time-limit", type=float, help="seconds to run, replaces --max-iters")
+    parser.add_argument("--tabu-size", type=int, default=100,
+                        help="iterations a moved (cache, video) pair stays tabu (default: 100)")
+    parser.add_argument("--stall-limit", type=int, default=1000,
+                        help="iterations without a new best before diversifying, 0 never (default: 1000)")
+    telemetry.add_arguments(parser)
+    checkpoint.add_arguments(parser)
+    args = parser.parse_args()
+    if args.init_from and args.resume:
+        parser.error("--init-from and --resume are exclusive")
     
-    input_filename = sys.argv[1]
+    input_filename = args.input_file
     input_path = os.path.join("dataset", input_filename)
     output_folder = "output_tabu"
     os.makedirs(output_folder, exist_ok=True)
@@ -119,11 +253,35 @@ def main():
         return
     
     output_path = os.path.join(output_folder, input_filename.replace(".in", ".out"))
+    checkpoint_file = checkpoint.checkpoint_path(output_folder, input_filename)
+    if args.resume and not os.path.exists(checkpoint_file):
+        print(f"Error: no checkpoint to resume from at {checkpoint_file}")
+        return
+    checkpointer, resume = checkpoint.from_args(args, checkpoint_file, "tabu", input_filename)
     
-    V, E, R, C, X, video_sizes, endpoints, requests = parse_input(input_path)
-    cache_videos = initialize_solution(V, C, X, video_sizes, requests)
-    optimized_cache_videos = tabu_search(cache_videos, V, C, X, video_sizes, endpoints, requests)
-    save_solution(optimized_cache_videos, output_path)
+    run_telemetry = telemetry.from_args(args, "tabu")
+    with telemetry.timed(run_telemetry, "io"):
+        V, E, R, C, X, video_sizes, endpoints, requests = parse_input(input_path, use_cache=not args.no_cache)
+    with telemetry.timed(run_telemetry, "init"):
+        if resume is not None:
+            cache_videos = checkpoint.unpack_solution(resume["solution"], C, X, video_sizes)
+        elif args.init_from:
+            try:
+                cache_videos = load_solution(args.init_from, C, X, video_sizes)
+            except (OSError, ValueError) as e:
+                print(f"Error: cannot start from {args.init_from}: {e}")
+                return
+        else:
+            cache_videos = build_solution(args.init, V, C, X, video_sizes, endpoints, requests)
+    max_iters = None if args.time_limit is not None else args.max_iters
+    optimized_cache_videos = tabu_search(cache_videos, V, C, X, video_sizes, endpoints, requests,
+                                         max_iters=max_iters, tabu_size=args.tabu_size, time_limit=args.time_limit,
+                                         stall_limit=args.stall_limit, run_telemetry=run_telemetry,
+                                         checkpointer=checkpointer, resume=resume)
+    with telemetry.timed(run_telemetry, "io"):
+        save_solution(optimized_cache_videos, output_path)
+    if run_telemetry is not None:
+        run_telemetry.close()
     
     print(f"Processed {input_filename}, output saved to {output_path}")
 
@@ -0,0 +1,127 @@
+import json
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class StderrSink:
+    """Writes one summary line per report to stderr."""
+
+    def emit(self, record):
+        phases = " ".join(f"{phase}={seconds:.1f}s" for phase, seconds in record["phases"].items())
+        counters = " ".join(f"{name}={value:.3g}" if isinstance(value, float) else f"{name}={value}"
+                            for name, value in record["counters"].items())
+        print(f"[{record['solver']} {record['elapsed']:.1f}s] it={record['iteration']} "
+              f"({record['rate']:.0f}/s) score={record['score']} best={record['best']} {counters} | {phases}",
+              file=sys.stderr, flush=True)
+
+    def close(self):
+        pass
+
+
+class JsonLinesSink:
+    """Appends every report as one JSON object per line to a file."""
+
+    def __init__(self, path):
+        self.file = open(path, "a")
+
+    def emit(self, record):
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class Telemetry:
+    """Counters, phase timers and scores of a solver run, reported to sinks every interval seconds.
+
+    Solvers take run_telemetry=None and only touch it behind an `is not None` check, so a run
+    without telemetry pays for nothing but that check. Time is split into phases with lap(),
+    which charges the time since the previous lap to the named phase.
+    """
+
+    def __init__(self, solver, sinks, interval=10.0):
+        self.solver = solver
+        self.sinks = list(sinks)
+        self.interval = interval
+        self.counters = {}
+        self.phases = {}
+        self.iteration = 0
+        self.score = self.best = None
+        self.start = self._mark = time.perf_counter()
+        self._next_report = self.start + interval
+
+    def lap(self, phase):
+        """Charges the time elapsed since the previous lap to phase."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._mark
+        self._mark = now
+
+    @contextmanager
+    def timed(self, phase):
+        """Charges the time spent in the with block to phase."""
+        self._mark = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.lap(phase)
+
+    def update(self, iteration, score, best, **counters):
+        """Records the progress of the run (counters are running totals) and reports it when due."""
+        self.iteration = iteration
+        self.score, self.best = score, best
+        self.counters.update(counters)
+        if time.perf_counter() >= self._next_report:
+            self.report()
+
+    def record(self):
+        """Returns the current state as a JSON-serializable dict."""
+        elapsed = time.perf_counter() - self.start
+        return {
+            "solver": self.solver,
+            "elapsed": round(elapsed, 3),
+            "iteration": self.iteration,
+            "rate": self.iteration / elapsed if elapsed > 0 else 0.0,
+            "score": self.score,
+            "best": self.best,
+            "counters": dict(self.counters),
+            "phases": {phase: round(seconds, 3) for phase, seconds in self.phases.items()},
+        }
+
+    def report(self):
+        """Sends the current state to every sink."""
+        record = self.record()
+        for sink in self.sinks:
+            sink.emit(record)
+        self._next_report = time.perf_counter() + self.interval
+
+    def close(self):
+        """Sends a last report and closes the sinks."""
+        self.report()
+        for sink in self.sinks:
+            sink.close()
+
+
+def timed(telemetry, phase):
+    """telemetry.timed(phase), or a no-op context when telemetry is disabled."""
+    return nullcontext() if telemetry is None else telemetry.timed(phase)
+
+
+def add_arguments(parser):
+    """Adds the telemetry options to a solver's command line."""
+    parser.add_argument("--progress", type=float, metavar="SECONDS",
+                        help="print counters, phase times and scores to stderr every SECONDS")
+    parser.add_argument("--telemetry-file", help="append the same reports as JSON lines to this file")
+
+
+def from_args(args, solver):
+    """Builds the Telemetry requested on the command line, or None when it is disabled."""
+    sinks = []
+    if args.progress is not None:
+        sinks.append(StderrSink())
+    if args.telemetry_file:
+        sinks.append(JsonLinesSink(args.telemetry_file))
+    if not sinks:
+        return None
+    return Telemetry(solver, sinks, interval=args.progress if args.progress is not None else 10.0)
@@ -0,0 +1,36 @@
+import pickle
+import random
+import numpy as np
+import pytest
+import checkpoint
+from solution import Solution
+
+
+def test_state_round_trip(tmp_path):
+    solution = Solution(4, 100, [10] * 20)
+    solution.add(0, 3)
+    solution.add(2, 5)
+    solution.add(2, 7)
+    state = {"iteration": 5, "rng": random.getstate(), "solution": solution, "best_saved": 123,
+             "memory": {"expiry": {(0, 3): 10, (2, 5): 4}, "frequency": {}}, "diversify_until": None,
+             "population": [(np.arange(5, dtype=np.uint8), np.array([1, 2]))], "best_fitness": np.int64(7),
+             "solver": "tabu", "instance": "a.in"}
+    path = str(tmp_path / "a.ckpt")
+    checkpoint.write_checkpoint(path, state)
+
+    loaded = checkpoint.load_checkpoint(path, "tabu", "a.in")
+    assert loaded["rng"] == state["rng"]
+    assert loaded["solution"] == {0: [3], 2: [5, 7]}
+    assert loaded["memory"] == state["memory"]
+    assert loaded["iteration"] == 5 and loaded["best_fitness"] == 7 and loaded["diversify_until"] is None
+    (bits, used), = loaded["population"]
+    assert bits.dtype == np.uint8 and bits.tolist() == [0, 1, 2, 3, 4] and used.tolist() == [1, 2]
+    with pytest.raises(ValueError):
+        checkpoint.load_checkpoint(path, "hill", "a.in")
+
+
+def test_pickled_checkpoint_is_not_loaded(tmp_path):
+    path = tmp_path / "old.ckpt"
+    path.write_bytes(pickle.dumps((1, {"solver": "hill", "instance": "a.in"})))
+    with pytest.raises(ValueError):
+        checkpoint.load_checkpoint(str(path), "hill", "a.in")
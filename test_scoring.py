@@ -0,0 +1,49 @@
+import random
+import pytest
+from generator import generate_instance
+from hillclimbing import compute_score
+from scoring import ScoreEngine
+from solution import Solution
+
+
+def full_saved(cache_videos, endpoints, requests):
+    """Recomputes the total saved time of a solution from scratch."""
+    total = 0
+    for video_id, endpoint_id, num_requests in requests:
+        data_center_latency, caches = endpoints[endpoint_id]
+        best = min([latency for cache_id, latency in caches.items() if video_id in cache_videos[cache_id]],
+                   default=data_center_latency)
+        total += max(data_center_latency - best, 0) * num_requests
+    return total
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_saved_matches_full_recompute(seed):
+    V, E, R, C, X, video_sizes, endpoints, requests = generate_instance(40, 8, 120, 5, 300, density=0.6,
+                                                                        max_video_size=120, seed=seed)
+    # A link slower than the data center never serves a request
+    endpoints[0][1][0] = endpoints[0][0] + 10
+    rng = random.Random(seed)
+    cache_videos = Solution(C, X, video_sizes)
+    engine = ScoreEngine(cache_videos, endpoints, requests)
+
+    for _ in range(300):
+        cache_id = rng.randrange(C)
+        video_id = rng.randrange(V)
+        before = engine.saved
+        if video_id in cache_videos[cache_id]:
+            expected = -engine.removal_loss(cache_id, video_id)
+            engine.remove(cache_id, video_id)
+        else:
+            delta, evicted = engine.best_swap(cache_id, video_id)
+            if delta is None:
+                continue
+            expected = delta
+            if evicted:
+                engine.swap(cache_id, video_id, evicted)
+            else:
+                engine.add(cache_id, video_id)
+        assert engine.saved - before == expected
+        assert engine.saved == full_saved(cache_videos, endpoints, requests)
+        assert engine.score() == compute_score(cache_videos, video_sizes, endpoints, requests)
+        assert all(cache_videos.used[c] <= X for c in range(C))
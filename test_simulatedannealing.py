@@ -0,0 +1,33 @@
+import random
+from initialization import build_solution
+from simulatedannealing import simulated_annealing
+from tabusearch import tabu_search
+
+
+def unlinked_cache_instance():
+    """Two caches, the second linked to no endpoint: the popularity init fills it with stray videos."""
+    V, C, X = 4, 2, 100
+    video_sizes = [10, 10, 10, 10]
+    endpoints = [(100, {0: 10})]
+    requests = [(0, 0, 5), (1, 0, 3)]
+    return V, C, X, video_sizes, endpoints, requests
+
+
+def test_annealing_empties_a_cache_without_candidates():
+    random.seed(0)
+    V, C, X, video_sizes, endpoints, requests = unlinked_cache_instance()
+    cache_videos = build_solution("popularity", V, C, X, video_sizes, endpoints, requests)
+    assert cache_videos[1]
+
+    solution = simulated_annealing(cache_videos, V, C, X, video_sizes, endpoints, requests, max_iters=2000)
+    assert solution[0] == {0, 1}
+    assert not solution[1]
+
+
+def test_tabu_search_survives_a_cache_without_candidates():
+    random.seed(0)
+    V, C, X, video_sizes, endpoints, requests = unlinked_cache_instance()
+    cache_videos = build_solution("popularity", V, C, X, video_sizes, endpoints, requests)
+
+    solution = tabu_search(cache_videos, V, C, X, video_sizes, endpoints, requests, max_iters=2000)
+    assert {0, 1} <= solution[0]
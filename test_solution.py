@@ -0,0 +1,37 @@
+import re
+import pytest
+from solution import load_solution
+
+# 3 caches of 100 MB, 5 videos
+C, X = 3, 100
+VIDEO_SIZES = [50, 50, 80, 20, 10]
+
+
+def load(tmp_path, text):
+    path = tmp_path / "a.out"
+    path.write_text(text)
+    return load_solution(str(path), C, X, VIDEO_SIZES)
+
+
+def test_valid_solution(tmp_path):
+    solution = load(tmp_path, "2\n0 0 1\n2 2 3\n")
+    assert solution[0] == {0, 1} and solution[1] == set() and solution[2] == {2, 3}
+    assert solution.used == [100, 0, 100]
+
+
+@pytest.mark.parametrize("text, message", [
+    ("", "expected the number of cache descriptions"),
+    ("one\n", "expected the number of cache descriptions"),
+    ("1\n0 a\n", "expected integers"),
+    ("1\n3 0\n", "cache id 3 is not in [0, 3)"),
+    ("1\n-1 0\n", "cache id -1 is not in [0, 3)"),
+    ("1\n0 5\n", "video id 5 is not in [0, 5)"),
+    ("2\n0 1\n0 2\n", "cache 0 is described twice"),
+    ("2\n0\n0 1\n", "cache 0 is described twice"),
+    ("1\n0 1 1\n", "cache 0 lists a video more than once"),
+    ("1\n0 0 2\n", "cache 0 holds 130 MB, more than its capacity of 100 MB"),
+    ("1\n0 0\n1 1\n", "2 cache descriptions but the first line announces 1"),
+])
+def test_invalid_solution(tmp_path, text, message):
+    with pytest.raises(ValueError, match=re.escape(message)):
+        load(tmp_path, text)